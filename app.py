@@ -1,7 +1,10 @@
 import streamlit as st 
 import time
+from datetime import datetime, timezone
 from openai import OpenAI
 from news_summarizer import NewsSummarizer
+from metrics import Metrics
+from precompute import PrecomputeScheduler
 import os
 from dotenv import load_dotenv
 
@@ -23,6 +26,38 @@ if not os.getenv("OPENAI_API_KEY"):
     st.error("❌ Please create .env file with OPENAI_API_KEY=sk-xxx")
     st.stop()
     
+def make_summarizer():
+    """
+    NEWS_HISTORY_DIR가 있으면 실행 결과를 누적 (기사 페이지의 과거 관련 기사 검색용)
+
+    세션/스케줄러마다 ResultStore가 따로 생기지만 append는 파일 잠금 안에서
+    meta.json을 다시 읽고 이어 쓰므로 같은 디렉터리를 공유해도 됨
+    """
+    history_dir = os.getenv("NEWS_HISTORY_DIR")
+    try:
+        return NewsSummarizer(history_dir=history_dir)
+    except ValueError:
+        # pyarrow가 없으면 누적 없이 실행
+        return NewsSummarizer()
+
+
+@st.cache_resource
+def get_scheduler():
+    """모든 세션이 공유하는 미리 계산 스케줄러 (PRECOMPUTE_KEYWORDS=키워드1,키워드2)"""
+    keywords = os.getenv("PRECOMPUTE_KEYWORDS", "").split(",")
+    scheduler = PrecomputeScheduler(make_summarizer(), keywords)
+    scheduler.start()
+    return scheduler
+
+
+def format_age(seconds):
+    if seconds < 60:
+        return "just now"
+    if seconds < 60 * 60:
+        return f"{int(seconds // 60)} min ago"
+    return f"{int(seconds // 3600)} h ago"
+
+
 col1, col2, col3 = st.columns([3, 1, 1])
 
 with col1:
@@ -43,38 +78,151 @@ if searched:
     elif not os.getenv("OPENAI_API_KEY"):
         st.error ("set your api key with the env")
     else:
+        try:
+            scheduler = get_scheduler()
+            cached = scheduler.get(query, limit)
+        except ValueError:
+            cached = None
+            scheduler = None
+
+        if cached:
+            # 미리 계산한 결과를 바로 보여주고, 오래되었으면 백그라운드에서 갱신
+            record = cached['record']
+            status = f"🕒 Updated {format_age(cached['age'])}"
+            if cached['refreshing']:
+                status += " · refreshing in background…"
+            if cached['stale']:
+                st.warning(status)
+            else:
+                st.caption(status)
+
+            for result in record['results']:
+                with st.container(border=True):
+                    st.markdown(
+                        f"**[Group {result['cluster_id'] + 1}] {result['representative_title']}** "
+                        f"· {result['size']} articles"
+                    )
+                    st.markdown(result['summary'])
+
+            valid_articles, texts = scheduler.summarizer.prepare_articles_for_embedding(
+                record['articles']
+            )
+            st.session_state.results = {
+                'success' : True,
+                'query' : query,
+                'articles' : valid_articles,
+                'texts' : texts,
+                'clusters' : record['results'],
+                'metrics' : None,
+                'total' : len(valid_articles),
+                'failed' : 0,
+                'generated_at' : cached['generated_at'],
+                'stale' : cached['stale'],
+            }
+            st.success(f" Found {len(valid_articles)} articles!")
+            st.page_link("pages/news.py", label="View all articles", icon="📰")
+            st.stop()
+
         try:
             if st.session_state.summarizer is None:
                 with st.spinner('....'):
-                    st.session_state.summarizer = NewsSummarizer()
+                    st.session_state.summarizer = make_summarizer()
             summarizer = st.session_state.summarizer
-            # loading animation and pop up intended
-            with st.spinner(f'Search Naver for query'):
-                articles = summarizer.crawl_news(keyword=query,max_articles=limit)
-                
-            st.info(f"articles")
-            
-            if articles:
-                with st.spinner('Process articles'):
-                    valid_articles, texts = summarizer.prepare_articles_for_embedding(articles)
-                    
-                if valid_articles:
-                    st.session_state.results = {
-                        'success' : True,
-                        'query' : query,
-                        'articles' : valid_articles,
-                        'texts' : texts,
-                        'total' : len(valid_articles),
-                        'failed' : len(articles) - len(valid_articles)
-                    }
-                    st.success(f" Found {len(valid_articles)} articles!")
-                    st.info("🔄 Redirecting to news page...")
-                    st.switch_page("pages/news.py")
-                else:
-                    st.session_state.results = {
-                        'success' : False,
-                        'error' : f'All'
-                    } 
+
+            progress = st.progress(0.0, text=f'Searching Naver for "{query}"...')
+            article_area = st.container()
+            cluster_area = st.container()
+
+            articles = []
+            summary_boxes = {}
+            summary_texts = {}
+            results = []
+            total = 0
+            metrics_before = summarizer.metrics.snapshot()
+
+            # 파이프라인 이벤트를 받는 대로 화면에 반영
+            for event in summarizer.run_stream(
+                    query, max_articles=limit, stream_tokens=True):
+                kind = event['type']
+
+                if kind == 'urls':
+                    total = event['total']
+                    progress.progress(0.0, text=f"Fetching {total} articles...")
+
+                elif kind == 'article':
+                    article = event['article']
+                    articles.append(article)
+                    progress.progress(
+                        len(articles) / max(total, 1),
+                        text=f"Fetched {len(articles)}/{total} articles",
+                    )
+                    if article['success'] and article.get('text'):
+                        with article_area.expander(f"📰 {article.get('title') or 'No title'}"):
+                            st.write(article['text'][:300] + "...")
+                            st.markdown(f"🔗 [Read Original Article]({article['url']})")
+
+                elif kind == 'embedded':
+                    progress.progress(
+                        1.0, text=f"Embedded {event['done']}/{event['total']} articles"
+                    )
+
+                elif kind == 'clusters':
+                    progress.progress(1.0, text="Summarizing clusters...")
+                    for cluster in event['clusters']:
+                        with cluster_area.container(border=True):
+                            st.markdown(
+                                f"**[Group {cluster['cluster_id'] + 1}] "
+                                f"{cluster['representative']['title']}** "
+                                f"· {cluster['size']} articles"
+                            )
+                            summary_boxes[cluster['cluster_id']] = st.empty()
+
+                elif kind == 'summary_delta':
+                    cluster_id = event['cluster_id']
+                    summary_texts[cluster_id] = summary_texts.get(cluster_id, '') + event['delta']
+                    summary_boxes[cluster_id].markdown(summary_texts[cluster_id])
+
+                elif kind == 'summary':
+                    result = event['result']
+                    summary_boxes[result['cluster_id']].markdown(result['summary'])
+
+                elif kind == 'done':
+                    results = event['results']
+                    valid_articles, texts = summarizer.prepare_articles_for_embedding(
+                        event['articles']
+                    )
+                    # 다음 같은 검색은 바로 보여주고 이후에는 스케줄러가 갱신
+                    if results and scheduler is not None:
+                        scheduler.put(query, {
+                            'keyword': query,
+                            'generated_at': datetime.now(timezone.utc).isoformat(),
+                            'n_articles': len(event['articles']),
+                            'articles': event['articles'],
+                            'results': results,
+                        }, limit)
+
+            progress.empty()
+            run_metrics = Metrics.diff(summarizer.metrics.snapshot(), metrics_before)
+
+            if results:
+                st.session_state.results = {
+                    'success' : True,
+                    'query' : query,
+                    'articles' : valid_articles,
+                    'texts' : texts,
+                    'clusters' : results,
+                    'metrics' : run_metrics,
+                    'total' : len(valid_articles),
+                    'failed' : len(articles) - len(valid_articles)
+                }
+                st.success(f" Found {len(valid_articles)} articles!")
+                st.page_link("pages/news.py", label="View all articles", icon="📰")
+            else:
+                st.session_state.results = {
+                    'success' : False,
+                    'error' : f'All'
+                }
+                st.warning("No valid articles found")
         except ValueError as e:
             st.error(f"Config error")
             st.session_state.summarizer = None
@@ -0,0 +1,64 @@
+"""
+클러스터링 알고리즘 벤치마크
+
+주제 중심 주변에 흩어진 합성 임베딩(L2 정규화)을 만들어 알고리즘별로
+클러스터링 + 대표 기사 선택 소요 시간과 정답 주제 대비 ARI를 비교
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_cluster
+    python -m benchmarks.bench_cluster --counts 1000 10000 --algorithms spherical minibatch --auto
+"""
+import sys
+import time
+import argparse
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from clustering import ALGORITHMS, cluster_embeddings, select_representatives
+from embeddings import l2_normalize, reduce_embeddings
+
+
+def synthetic_embeddings(count: int, topics: int, dim: int, noise: float, seed: int = 0):
+    """(L2 정규화된 임베딩, 정답 주제 라벨)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    truth = rng.integers(0, topics, count)
+    noisy = centers[truth] + noise * rng.standard_normal((count, dim)).astype(np.float32)
+    return l2_normalize(noisy), truth
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="클러스터링 알고리즘 벤치마크")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS,
+                        default=["kmeans", "spherical", "minibatch"])
+    parser.add_argument("--topics", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--noise", type=float, default=0.8)
+    parser.add_argument("--dims", type=int, default=None,
+                        help="지정하면 PCA로 이 차원까지 줄인 뒤 클러스터링 (cluster_dims)")
+    parser.add_argument("--auto", action="store_true", help="클러스터 수 자동 선택")
+    args = parser.parse_args(argv)
+
+    for count in args.counts:
+        embeddings, truth = synthetic_embeddings(count, args.topics, args.dim, args.noise)
+        if args.dims:
+            embeddings = reduce_embeddings(embeddings, args.dims)
+
+        print(f"기사 {count}건, {embeddings.shape[1]}차원, 주제 {args.topics}개")
+        for algorithm in args.algorithms:
+            n_clusters = None if args.auto else args.topics
+            start = time.perf_counter()
+            labels, centroids = cluster_embeddings(embeddings, n_clusters, algorithm=algorithm)
+            select_representatives(embeddings, labels, centroids)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {algorithm:<13} {elapsed * 1000:9.1f} ms   클러스터 {len(centroids):3d}개"
+                f"   ARI {adjusted_rand_score(truth, labels):.3f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+HTML 파서 백엔드 벤치마크
+
+fixture 기사/검색 HTML(또는 --html로 지정한 저장된 기사 페이지)을 백엔드별로 파싱해
+페이지당 소요 시간과 초당 처리량을 비교하고, 추출 결과가 bs4와 같은지 확인
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --html saved_article.html --repeat 500
+"""
+import sys
+import time
+import argparse
+
+from benchmarks.fake_server import FixtureConfig, article_html, search_page_html
+from news_summarizer import NewsSummarizer
+from parsers import available_backends, parse_article, parse_search_results
+
+
+def measure(func, repeat: int) -> float:
+    """func를 repeat번 실행한 평균 소요 시간(초)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTML 파서 백엔드 벤치마크")
+    parser.add_argument("--html", help="기사 HTML 파일 (없으면 fixture 기사 사용)")
+    parser.add_argument("--paragraphs", type=int, default=60, help="fixture 기사 문단 수")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    config = FixtureConfig(n_results=10, page_size=10, paragraphs=args.paragraphs)
+    if args.html:
+        with open(args.html, "rb") as f:
+            article = f.read()
+    else:
+        article = article_html(config, 1).encode()
+    search = search_page_html(config, "http://127.0.0.1", 1).encode()
+    domains = NewsSummarizer.NEWS_DOMAINS
+
+    expected_article = parse_article(article, None, "bs4")
+    expected_search = parse_search_results(search, domains, None, "bs4")
+
+    print(f"기사 {len(article) / 1024:.1f} KiB, 검색 결과 {len(search) / 1024:.1f} KiB, {args.repeat}회 반복")
+    for backend in available_backends():
+        same = (
+            parse_article(article, None, backend) == expected_article
+            and parse_search_results(search, domains, None, backend) == expected_search
+        )
+        article_time = measure(lambda: parse_article(article, None, backend), args.repeat)
+        search_time = measure(
+            lambda: parse_search_results(search, domains, None, backend), args.repeat
+        )
+        print(
+            f"  {backend:<11} 기사 {article_time * 1000:7.3f} ms ({1 / article_time:8.1f}/s)"
+            f"   검색 {search_time * 1000:7.3f} ms"
+            f"   bs4와 결과 {'일치' if same else '불일치'}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+NewsSummarizer 파이프라인 벤치마크
+
+로컬 fixture 서버(네이버 검색/기사 HTML)와 OpenAI 호환 가짜 엔드포인트를 띄우고,
+기사 수별로 단계별 소요 시간, 처리량, 기사 요청 지연 p50/p95, 메모리 peak를 측정
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --counts 5 20 100 --fetch-latency 0.05 --json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from typing import Dict, List
+
+from benchmarks.fake_server import FakeServer, FixtureConfig
+
+
+STAGES = ["search", "fetch", "prepare", "dedup", "embed", "cluster", "summarize"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+class StageTimer:
+    """단계별 wall time과 tracemalloc 기준 메모리 peak 기록"""
+
+    def __init__(self):
+        self.times: Dict[str, float] = {}
+        self.peaks: Dict[str, int] = {}
+
+    def measure(self, name: str, func, *args, **kwargs):
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.times[name] = time.perf_counter() - start
+        self.peaks[name] = tracemalloc.get_traced_memory()[1]
+        return result
+
+
+def bench_staged(summarizer, keyword: str, count: int, n_clusters: int) -> Dict:
+    """각 단계를 순서대로 호출하며 단계별로 측정"""
+    timer = StageTimer()
+
+    # 기사별 요청 지연을 재기 위해 extract_news_article을 감쌈
+    latencies = []
+    extract = summarizer.extract_news_article
+
+    def timed_extract(url):
+        start = time.perf_counter()
+        try:
+            return extract(url)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    summarizer.extract_news_article = timed_extract
+    try:
+        urls = timer.measure("search", summarizer.get_news_url, keyword, count)
+        articles = timer.measure(
+            "fetch", lambda: [a for _, a in sorted(summarizer.iter_articles(urls))]
+        )
+    finally:
+        del summarizer.extract_news_article
+
+    valid_articles, texts = timer.measure(
+        "prepare", summarizer.prepare_articles_for_embedding, articles
+    )
+    valid_articles, texts = timer.measure(
+        "dedup", summarizer.dedup_articles, valid_articles, texts
+    )
+    embeddings = timer.measure("embed", summarizer.get_embeddings, texts)
+    clusters = timer.measure(
+        "cluster", summarizer.cluster_articles, embeddings, valid_articles, n_clusters
+    )
+    timer.measure("summarize", summarizer.summarize_all_clusters, clusters)
+
+    total = sum(timer.times.values())
+    return {
+        "articles": len(valid_articles),
+        "stage_seconds": timer.times,
+        "stage_peak_bytes": timer.peaks,
+        "total_seconds": total,
+        "articles_per_second": len(valid_articles) / total if total else 0.0,
+        "fetch_p50_ms": percentile(latencies, 50) * 1000,
+        "fetch_p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def bench_stream(summarizer, keyword: str, count: int, n_clusters: int) -> Dict:
+    """run_stream 전체 소요 시간과 첫 기사/첫 요약까지 걸린 시간 측정"""
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    first_article = first_summary = None
+    n_articles = 0
+
+    for event in summarizer.run_stream(keyword, count, n_clusters):
+        now = time.perf_counter() - start
+        if event["type"] == "article" and first_article is None:
+            first_article = now
+        elif event["type"] == "summary" and first_summary is None:
+            first_summary = now
+        elif event["type"] == "done":
+            n_articles = len(event["articles"])
+
+    total = time.perf_counter() - start
+    return {
+        "total_seconds": total,
+        "articles_per_second": n_articles / total if total else 0.0,
+        "first_article_seconds": first_article,
+        "first_summary_seconds": first_summary,
+        "peak_bytes": tracemalloc.get_traced_memory()[1],
+    }
+
+
+def print_report(report: Dict):
+    staged = report["staged"]
+    stream = report["stream"]
+    print(f"\n=== {report['count']}개 기사 ===")
+    for stage in STAGES:
+        print(
+            f"  {stage:<10} {staged['stage_seconds'][stage] * 1000:9.1f} ms"
+            f"   peak {staged['stage_peak_bytes'][stage] / 1024 / 1024:7.2f} MiB"
+        )
+    print(
+        f"  staged 합계 {staged['total_seconds']:.3f}s "
+        f"({staged['articles_per_second']:.1f} articles/s), "
+        f"기사 요청 p50 {staged['fetch_p50_ms']:.1f} ms / p95 {staged['fetch_p95_ms']:.1f} ms"
+    )
+    print(
+        f"  run_stream {stream['total_seconds']:.3f}s "
+        f"({stream['articles_per_second']:.1f} articles/s), "
+        f"첫 기사 {stream['first_article_seconds'] or 0:.3f}s, "
+        f"첫 요약 {stream['first_summary_seconds'] or 0:.3f}s, "
+        f"peak {stream['peak_bytes'] / 1024 / 1024:.2f} MiB"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NewsSummarizer 파이프라인 벤치마크")
+    parser.add_argument("--counts", type=int, nargs="+", default=[5, 20, 100, 1000])
+    parser.add_argument("--clusters", type=int, default=3)
+    parser.add_argument("--cluster-algorithm", default="kmeans",
+                        help="클러스터링 알고리즘 (kmeans/spherical/minibatch/agglomerative/hdbscan)")
+    parser.add_argument("--summary-mode", default="representative",
+                        help="클러스터 요약 방식 (representative/mapreduce)")
+    parser.add_argument("--page-size", type=int, default=10,
+                        help="검색 결과 페이지당 기사 수")
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="기사 응답 지연(초)")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="임베딩 응답 지연(초)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="요약 응답 지연(초)")
+    parser.add_argument("--duplicates", type=int, default=1,
+                        help="fixture 기사마다 같은 본문으로 재배포되는 횟수 (중복 제거 측정용)")
+    parser.add_argument("--parser", default="auto", help="HTML 파서 백엔드 (auto/selectolax/lxml/bs4)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="파싱 프로세스 수 (0이면 크롤링 스레드에서 파싱)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = parser.parse_args(argv)
+
+    config = FixtureConfig(
+        fetch_latency=args.fetch_latency,
+        embed_latency=args.embed_latency,
+        llm_latency=args.llm_latency,
+        duplicates=args.duplicates,
+    )
+
+    with FakeServer(config) as server:
+        # 실제 API로 요청이 나가지 않도록 가짜 엔드포인트로 고정
+        os.environ["OPENAI_API_KEY"] = "sk-bench"
+        os.environ["OPENAI_BASE_URL"] = server.openai_base_url
+
+        from news_summarizer import NewsSummarizer
+
+        tracemalloc.start()
+        for count in args.counts:
+            config.n_results = count
+            config.page_size = args.page_size
+
+            # 캐시 없이 매번 새 인스턴스로 측정
+            summarizer = NewsSummarizer(
+                cache_dir=None, parser=args.parser, parse_workers=args.parse_workers,
+                cluster_algorithm=args.cluster_algorithm, summary_mode=args.summary_mode,
+            )
+            summarizer.SEARCH_URL = server.search_url
+            try:
+                report = {
+                    "count": count,
+                    "staged": bench_staged(summarizer, "벤치마크", count, args.clusters),
+                    "stream": bench_stream(summarizer, "벤치마크", count, args.clusters),
+                }
+            finally:
+                summarizer.close()
+
+            if args.json:
+                print(json.dumps(report, ensure_ascii=False))
+            else:
+                print_report(report)
+        tracemalloc.stop()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+벤치마크용 로컬 서버
+
+- 네이버 뉴스 검색/기사 페이지와 같은 구조의 HTML을 반환하는 fixture 서버
+- OpenAI 호환 /v1/embeddings, /v1/chat/completions 엔드포인트 (지연 시간 설정 가능)
+
+하나의 포트에서 경로로 구분해 처리하며, 기사 URL 경로에 news.naver.com을 포함시켜
+NewsSummarizer.get_news_url의 도메인 필터를 그대로 통과하도록 함
+"""
+import json
+import base64
+import time
+import hashlib
+import threading
+import urllib.parse
+import numpy as np
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+SEARCH_PATH = "/search.naver"
+ARTICLE_PATH = "/news.naver.com/article/"
+
+# 기사 본문을 만들 때 섞어 쓰는 문장들 (여러 주제가 나오도록 주제별로 구분)
+TOPICS = [
+    ["반도체 수출이 전년 대비 크게 늘었다.", "메모리 가격 상승세가 이어지고 있다.",
+     "업계는 하반기 실적 개선을 기대하고 있다."],
+    ["기준금리가 동결되었다.", "한국은행은 물가 흐름을 지켜보겠다고 밝혔다.",
+     "가계부채 증가세가 변수로 꼽힌다."],
+    ["프로야구 정규시즌이 막바지에 접어들었다.", "선두 경쟁이 치열하게 이어지고 있다.",
+     "팬들의 관심이 포스트시즌으로 쏠리고 있다."],
+]
+
+
+class FixtureConfig:
+    def __init__(
+        self, n_results: int = 20, page_size: int = 10,
+        fetch_latency: float = 0.0, embed_latency: float = 0.0,
+        llm_latency: float = 0.0, paragraphs: int = 20, dim: int = 1536,
+        duplicates: int = 1):
+        self.n_results = n_results
+        self.page_size = page_size
+        self.fetch_latency = fetch_latency
+        self.embed_latency = embed_latency
+        self.llm_latency = llm_latency
+        self.paragraphs = paragraphs
+        self.dim = dim
+        # 같은 기사가 연속으로 몇 번씩 재배포되는지 (언론사 표기만 다르고 본문은 같음)
+        self.duplicates = duplicates
+
+
+def search_page_html(config: FixtureConfig, base_url: str, start: int) -> str:
+    """네이버 검색 결과 페이지 구조를 흉내낸 HTML (start는 1부터 시작하는 결과 오프셋)"""
+    items = []
+    end = min(start - 1 + config.page_size, config.n_results)
+    for i in range(start - 1, end):
+        items.append(
+            f'<div class="news_item">'
+            f'<a href="https://press.example.com/{i}">언론사 기사 {i}</a>'
+            f'<a href="{base_url}{ARTICLE_PATH}{i}">'
+            f'<span class="sds-comps-text sds-comps-text-ellipsis sds-comps-text-ellipsis-1">'
+            f'네이버뉴스</span></a></div>'
+        )
+    return (
+        "<html><head><title>검색</title></head><body>"
+        f"<div class=\"group_news\">{''.join(items)}</div>"
+        "</body></html>"
+    )
+
+
+def article_html(config: FixtureConfig, article_id: int) -> str:
+    """네이버 뉴스 기사 페이지 구조를 흉내낸 HTML"""
+    story_id = article_id // config.duplicates
+    topic = TOPICS[story_id % len(TOPICS)]
+    body = f"<p>(언론사 {article_id})</p>" + "".join(
+        f"<p>{topic[(story_id + k) % len(topic)]} (기사 {story_id}-{k})</p>"
+        f"<img src=\"/img/{k}.jpg\"><script>var x = {k};</script>"
+        for k in range(config.paragraphs)
+    )
+    return (
+        "<html><head><title>기사</title><style>p { margin: 0; }</style></head><body>"
+        f"<div id=\"ct\"><h2 id=\"title_area\"><span>{topic[0]} ({article_id})</span></h2>"
+        f"<article id=\"dic_area\">{body}</article></div>"
+        "</body></html>"
+    )
+
+
+def fake_embedding(text: str, dim: int, encoding_format: str = "float"):
+    """텍스트 해시로 시드를 정해 항상 같은 벡터를 반환 (base64면 float32 bytes를 인코딩)"""
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    if encoding_format == "base64":
+        return base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+    return vector.tolist()
+
+
+def make_handler(config: FixtureConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, payload: dict):
+            self._send(200, json.dumps(payload).encode(), "application/json")
+
+        def do_GET(self):
+            parsed = urllib.parse.urlsplit(self.path)
+            base_url = f"http://{self.headers['Host']}"
+
+            if parsed.path == SEARCH_PATH:
+                query = urllib.parse.parse_qs(parsed.query)
+                start = int(query.get("start", ["1"])[0])
+                html = search_page_html(config, base_url, start)
+                self._send(200, html.encode(), "text/html; charset=utf-8")
+            elif parsed.path.startswith(ARTICLE_PATH):
+                time.sleep(config.fetch_latency)
+                article_id = int(parsed.path[len(ARTICLE_PATH):])
+                html = article_html(config, article_id)
+                self._send(200, html.encode(), "text/html; charset=utf-8")
+            else:
+                self._send(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+
+            if self.path.endswith("/embeddings"):
+                time.sleep(config.embed_latency)
+                inputs = request["input"]
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                self._send_json({
+                    "object": "list",
+                    "model": request["model"],
+                    "data": [
+                        {"object": "embedding", "index": i,
+                         "embedding": fake_embedding(
+                             text, config.dim, request.get("encoding_format", "float"))}
+                        for i, text in enumerate(inputs)
+                    ],
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                })
+            elif self.path.endswith("/chat/completions"):
+                time.sleep(config.llm_latency)
+                self._send_json({
+                    "id": "chatcmpl-bench",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request["model"],
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": "벤치마크용 요약입니다."},
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+            else:
+                self._send(404, b"not found", "text/plain")
+
+    return Handler
+
+
+class FakeServer:
+    """백그라운드 스레드에서 도는 fixture + OpenAI 호환 서버"""
+
+    def __init__(self, config: FixtureConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(config))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.base_url}{SEARCH_PATH}?where=news&query={{query}}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,568 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import urllib.parse
+from contextlib import contextmanager
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# 같은 기사를 가리키지만 캐시 키를 흩뜨리는 추적용 쿼리 파라미터
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+
+def normalize_url(url: str) -> str:
+    """
+    캐시 키로 쓸 URL 정규화
+
+    - scheme/host 소문자화, fragment 제거
+    - 추적용 파라미터 제거 후 쿼리 파라미터 정렬
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    query = [
+        (k, v)
+        for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.startswith(TRACKING_PARAMS)
+    ]
+    query.sort()
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or "/",
+        urllib.parse.urlencode(query),
+        "",
+    ))
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    여러 프로세스가 같은 파일을 append 할 때 쓰는 배타적 잠금 (flock)
+
+    fcntl이 없는 플랫폼(Windows)에서는 잠그지 않음 (프로세스 안에서는 호출하는 쪽의 lock으로 직렬화)
+    """
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _SQLiteLRUCache:
+    """
+    TTL + 용량 기반 LRU 정리를 공유하는 SQLite 캐시 기반 클래스
+
+    - 하위 클래스는 _table, _schema, _created_column을 정의
+    - 테이블에는 _created_column, accessed_at, size 컬럼이 있어야 함
+    - ttl 초가 지난 항목은 만료로 취급하고 삭제
+    - size 합이 max_bytes를 넘으면 가장 오래 조회되지 않은 항목부터 삭제 (LRU)
+    - 조회 시각(accessed_at)은 메모리에 모아 두었다가 touch_interval초마다, 또는 쓰기/정리 전에
+      한 번에 기록 (조회마다 쓰기 트랜잭션을 만들지 않음)
+    - 여러 스레드에서 동시에 접근하므로 lock으로 직렬화
+    """
+
+    _table = None
+    _schema = None
+    _created_column = "created_at"
+    touch_interval = 60.0
+    _max_pending_touches = 1024
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pending_touches: Dict[str, float] = {}
+        self._last_flush = time.time()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(self._schema)
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self._table}_accessed "
+            f"ON {self._table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _touch(self, key: str, created_at: float) -> bool:
+        """
+        조회된 항목의 accessed_at 갱신 예약 (lock 안에서 호출)
+
+        Returns:
+            만료되지 않았으면 True, 만료되어 삭제했으면 False
+        """
+        now = time.time()
+        if now - created_at > self.ttl:
+            self._pending_touches.pop(key, None)
+            self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            self._conn.commit()
+            return False
+
+        self._pending_touches[key] = now
+        if (now - self._last_flush >= self.touch_interval
+                or len(self._pending_touches) >= self._max_pending_touches):
+            self._flush_touches()
+            self._conn.commit()
+        return True
+
+    def _flush_touches(self):
+        """모아 둔 accessed_at을 한 번에 기록 (lock 안에서 호출, commit은 호출하는 쪽에서)"""
+        self._last_flush = time.time()
+        if not self._pending_touches:
+            return
+        self._conn.executemany(
+            f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_touches.items()],
+        )
+        self._pending_touches.clear()
+
+    def _evict(self):
+        """만료 항목 삭제 후 max_bytes 이하가 될 때까지 LRU 순으로 삭제 (lock 안에서 호출)"""
+        # LRU 순서가 최근 조회를 반영하도록 먼저 기록
+        self._flush_touches()
+        self._conn.execute(
+            f"DELETE FROM {self._table} WHERE {self._created_column} < ?",
+            (time.time() - self.ttl,)
+        )
+
+        total = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self._table}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # accessed_at 인덱스 순으로 필요한 만큼만 읽음 (테이블 전체를 메모리에 올리지 않음)
+        cursor = self._conn.execute(
+            f"SELECT key, size FROM {self._table} ORDER BY accessed_at ASC"
+        )
+        victims = []
+        for key, size in cursor:
+            victims.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        # 읽는 중인 테이블을 지우지 않도록 커서를 닫은 뒤 삭제
+        cursor.close()
+        self._conn.executemany(f"DELETE FROM {self._table} WHERE key = ?", victims)
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+
+class ArticleCache(_SQLiteLRUCache):
+    """
+    정규화된 URL → (제목, 본문, 수집 시각)을 저장하는 기사 캐시
+    """
+
+    _table = "articles"
+    _created_column = "fetched_at"
+    _schema = """
+        CREATE TABLE IF NOT EXISTS articles (
+            key TEXT PRIMARY KEY,
+            title TEXT,
+            text TEXT,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+    """
+
+    def __init__(
+        self, path: str, ttl: float = 6 * 60 * 60,
+        max_bytes: int = 200 * 1024 * 1024):
+        super().__init__(path, ttl, max_bytes)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """캐시된 기사 반환, 없거나 만료되었으면 None"""
+        key = normalize_url(url)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, text, fetched_at FROM articles WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or not self._touch(key, row[2]):
+                return None
+
+        title, text, fetched_at = row
+        return {
+            'url': url,
+            'title': title,
+            'text': text,
+            'success': True,
+            'cached': True,
+            'fetched_at': fetched_at,
+        }
+
+    def put(self, article: Dict):
+        """크롤링에 성공한 기사 저장 후 용량 초과분 정리"""
+        if not article.get('success'):
+            return
+
+        title = article.get('title')
+        text = article.get('text')
+        size = len((title or '').encode()) + len((text or '').encode())
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_url(article['url']), title, text, now, now, size),
+            )
+            self._evict()
+            self._conn.commit()
+
+
+class SummaryCache(_SQLiteLRUCache):
+    """
+    (입력 텍스트, 모델, 프롬프트, 생성 파라미터) 해시 → 요약문을 저장하는 캐시
+    """
+
+    _table = "summaries"
+    _schema = """
+        CREATE TABLE IF NOT EXISTS summaries (
+            key TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+    """
+
+    def __init__(
+        self, path: str, ttl: float = 24 * 60 * 60,
+        max_bytes: int = 20 * 1024 * 1024):
+        super().__init__(path, ttl, max_bytes)
+
+    @staticmethod
+    def make_key(request: Dict) -> str:
+        """chat completion 요청 인자(model, messages, max_tokens 등) 전체로 키 생성"""
+        payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 요약 반환, 없거나 만료되었으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or not self._touch(key, row[1]):
+                return None
+        return row[0]
+
+    def put(self, key: str, summary: str):
+        """요약 저장 후 용량 초과분 정리"""
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                (key, summary, now, now, len(summary.encode())),
+            )
+            self._evict()
+            self._conn.commit()
+
+
+class ResultCache(_SQLiteLRUCache):
+    """
+    (키워드, 파이프라인 파라미터) → 실행 결과 레코드(JSON)와 생성 시각을 저장하는 캐시
+
+    미리 계산한 결과를 바로 보여주는 용도라서 오래된 결과도 ttl까지는 그대로 반환하고,
+    얼마나 오래되었는지는 호출하는 쪽이 생성 시각으로 판단
+    """
+
+    _table = "results"
+    _schema = """
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+    """
+
+    def __init__(
+        self, path: str, ttl: float = 7 * 24 * 60 * 60,
+        max_bytes: int = 100 * 1024 * 1024):
+        super().__init__(path, ttl, max_bytes)
+
+    @staticmethod
+    def make_key(keyword: str, **params) -> str:
+        return json.dumps([keyword.strip(), params], ensure_ascii=False, sort_keys=True)
+
+    def get(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """(레코드, 생성 시각) 반환, 없거나 ttl이 지났으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or not self._touch(key, row[1]):
+                return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, record: Dict, created_at: Optional[float] = None):
+        """레코드 저장 후 용량 초과분 정리 (created_at 기본값은 현재 시각)"""
+        payload = json.dumps(record, ensure_ascii=False)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, payload, created_at or now, now, len(payload.encode())),
+            )
+            self._evict()
+            self._conn.commit()
+
+
+class EmbeddingCache:
+    """
+    (모델명, 임베딩 입력 텍스트) 해시 → 임베딩 벡터를 저장하는 디스크 캐시
+
+    - 벡터는 float32 행렬 파일(.f32)에 행 단위로 append 하고 np.memmap으로 읽음
+    - 인덱스 파일(.idx)은 첫 줄에 차원, 이후 한 줄에 "해시 행 번호"를 기록
+      (예전 형식처럼 행 번호가 없으면 줄 번호 = 행 번호)
+    - 여러 인스턴스/프로세스가 같은 디렉터리를 쓰므로 append는 .lock 파일 잠금 안에서 하고,
+      행 번호는 행렬 파일 크기로 정함. 다른 쪽이 추가한 해시는 조회 전에 인덱스 파일 끝에서 읽어옴
+    - 조회 결과는 memmap의 행 view라서 복사 없이 반환됨
+    """
+
+    def __init__(self, directory: str, model: str):
+        os.makedirs(directory, exist_ok=True)
+
+        self.model = model
+        name = model.replace("/", "_")
+        self.matrix_path = os.path.join(directory, f"embeddings-{name}.f32")
+        self.index_path = os.path.join(directory, f"embeddings-{name}.idx")
+        self.lock_path = os.path.join(directory, f"embeddings-{name}.lock")
+        self._lock = threading.Lock()
+
+        self.dim = None
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+        # 인덱스 파일을 어디까지 읽었는지 (바이트 위치, 해시 줄 수)
+        self._index_pos = 0
+        self._index_lines = 0
+
+        with self._lock:
+            self._load_index()
+
+    def _load_index(self):
+        """인덱스 파일에서 아직 읽지 않은 줄을 읽어 반영 (lock 안에서 호출)"""
+        if not os.path.exists(self.index_path):
+            return
+        if os.path.getsize(self.index_path) == self._index_pos:
+            return
+
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_pos)
+            data = f.read()
+        # 다른 프로세스가 쓰는 중인 마지막 줄은 다음에 읽음
+        data = data[:data.rfind(b"\n") + 1]
+        self._index_pos += len(data)
+
+        lines = data.decode("utf-8").splitlines()
+        if self.dim is None and lines:
+            self.dim = int(lines.pop(0))
+
+        for line in lines:
+            parts = line.split()
+            if not parts:
+                continue
+            row = int(parts[1]) if len(parts) > 1 else self._index_lines
+            self._index_lines += 1
+            self._rows.setdefault(parts[0], row)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode()).hexdigest()
+
+    def _mapped(self, min_rows: int) -> Optional[np.ndarray]:
+        """min_rows 이상 행이 매핑된 memmap 반환, 파일에 아직 그만큼 없으면 None"""
+        if self._matrix is None or self._matrix.shape[0] < min_rows:
+            n_rows = os.path.getsize(self.matrix_path) // (4 * self.dim)
+            if n_rows < min_rows:
+                return None
+            self._matrix = np.memmap(
+                self.matrix_path, dtype=np.float32, mode="r",
+                shape=(n_rows, self.dim),
+            )
+        return self._matrix
+
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        캐시에 있는 텍스트의 임베딩 조회
+
+        Returns:
+            {texts 내 인덱스: 임베딩 벡터(float32 memmap view)}
+        """
+        with self._lock:
+            self._load_index()
+            if not self._rows:
+                return {}
+
+            found = {}
+            for i, text in enumerate(texts):
+                row = self._rows.get(self._key(text))
+                if row is not None:
+                    found[i] = row
+            if not found:
+                return {}
+
+            matrix = self._mapped(max(found.values()) + 1)
+            if matrix is None:
+                # 벡터 기록 후 해시 기록 전에 중단된 경우 등 행렬 파일이 더 짧으면 있는 행만 사용
+                matrix = self._mapped(0)
+            return {i: matrix[row] for i, row in found.items() if row < matrix.shape[0]}
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """새로 계산한 임베딩을 행렬 파일과 인덱스 파일 끝에 추가"""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if len(texts) == 0:
+            return
+
+        with self._lock, file_lock(self.lock_path):
+            # 다른 인스턴스가 그사이 추가한 해시/헤더를 먼저 반영
+            self._load_index()
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.write(f"{self.dim}\n")
+                self._index_pos = os.path.getsize(self.index_path)
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(
+                    f"임베딩 차원이 캐시와 다릅니다: {embeddings.shape[1]} != {self.dim}"
+                )
+
+            new_keys, new_rows, seen = [], [], set()
+            for text, vector in zip(texts, embeddings):
+                key = self._key(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+
+            if not new_keys:
+                return
+
+            # 행 번호는 인덱스 줄 수가 아니라 행렬 파일에 실제로 기록된 행 수 기준
+            # (중간에 끊긴 append의 행은 인덱스에 없으므로 그냥 건너뜀)
+            with open(self.matrix_path, "ab") as f:
+                start = f.tell() // (4 * self.dim)
+                f.truncate(start * 4 * self.dim)
+                f.write(np.stack(new_rows).tobytes())
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write("".join(
+                    f"{key} {start + offset}\n" for offset, key in enumerate(new_keys)
+                ))
+            self._index_pos = os.path.getsize(self.index_path)
+            self._index_lines += len(new_keys)
+
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = start + offset
+
+
+class ClusterStateStore:
+    """
+    키워드별 증분 클러스터링 상태 저장소
+
+    - {키워드 해시}.npy: 멤버 기사 임베딩 (멤버 수 x 차원 float32, 클러스터 중심 재계산용)
+    - {키워드 해시}.json: 멤버 기사, 멤버별 클러스터 번호, 클러스터별 대표 기사 URL/요약, 갱신 시각
+    - 임베딩 모델이 바뀌면 키도 달라져 이전 상태를 쓰지 않음
+    - directory=None이면 디스크 대신 메모리에만 보관
+    - load → 수정 → save 사이에 같은 키워드의 다른 실행이 끼어들지 않도록 lock(keyword)으로 감쌈
+      (스레드 lock + directory가 있으면 {키워드 해시}.lock 파일 잠금)
+
+    state 형식:
+        {
+            'vectors': np.ndarray,
+            'labels': [클러스터 번호, ...],
+            'articles': [기사, ...],
+            'clusters': [{'representative_url': ..., 'source': 요약 입력 식별값, 'summary': ...}, ...],
+            'updated_at': 갱신 시각 (ISO 8601),
+        }
+    """
+
+    def __init__(self, directory: Optional[str], model: str):
+        self.directory = directory
+        self.model = model
+        self._memory: Dict[str, Dict] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def lock(self, keyword: str):
+        """키워드 상태를 읽고 다시 저장하는 동안 같은 키워드의 다른 실행을 막음"""
+        with self._locks_guard:
+            keyword_lock = self._locks.setdefault(keyword, threading.Lock())
+        with keyword_lock:
+            if not self.directory:
+                yield
+                return
+            with file_lock(os.path.join(self.directory, f"{self._key(keyword)}.lock")):
+                yield
+
+    def _key(self, keyword: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{keyword}".encode()).hexdigest()[:32]
+
+    def _paths(self, keyword: str):
+        base = os.path.join(self.directory, self._key(keyword))
+        return f"{base}.npy", f"{base}.json"
+
+    def load(self, keyword: str) -> Optional[Dict]:
+        if not self.directory:
+            return self._memory.get(keyword)
+
+        vectors_path, meta_path = self._paths(keyword)
+        if not (os.path.exists(vectors_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            state = json.load(f)
+        state['vectors'] = np.load(vectors_path, mmap_mode="r")
+        if len(state['vectors']) != len(state['labels']):
+            return None
+        return state
+
+    def save(self, keyword: str, state: Dict):
+        if not self.directory:
+            self._memory[keyword] = state
+            return
+
+        # 다른 프로세스가 중간 상태를 읽지 않도록 임시 파일에 쓴 뒤 교체
+        # (json을 나중에 교체하므로 두 교체 사이에 읽으면 길이가 달라 load가 None 반환)
+        vectors_path, meta_path = self._paths(keyword)
+        meta = {k: v for k, v in state.items() if k != 'vectors'}
+        with open(f"{vectors_path}.tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(state['vectors'], dtype=np.float32))
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def clear(self, keyword: str):
+        """키워드 상태 삭제 (다음 증분 실행은 처음부터 클러스터링)"""
+        if not self.directory:
+            self._memory.pop(keyword, None)
+            return
+        for path in self._paths(keyword):
+            if os.path.exists(path):
+                os.remove(path)
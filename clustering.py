@@ -0,0 +1,235 @@
+"""
+기사 임베딩 클러스터링
+
+입력은 L2 정규화된 float32 임베딩 (get_embeddings 결과)이며, 정규화된 벡터에서는
+내적 = 코사인 유사도이므로 대표 기사 선택 등을 행렬 연산 한 번으로 처리
+
+알고리즘
+- "kmeans": sklearn KMeans (n_init=10, 기존 방식)
+- "spherical": 중심도 단위 벡터로 유지하는 코사인 기준 k-means
+- "minibatch": MiniBatchKMeans (수천~수만 건에서 빠름)
+- "agglomerative": 코사인 average linkage (distance_threshold로 클러스터 수 자동 결정, O(n²) 메모리)
+- "hdbscan": 밀도 기반 (클러스터 수 자동 결정, 노이즈 기사는 가장 가까운 클러스터에 배정)
+
+증분 클러스터링(assign_to_centroids)은 저장된 클러스터 중심에 새 기사만 배정
+
+agglomerative/hdbscan은 고차원에서 느리므로 기사가 많으면 PCA 축소(cluster_dims)와 함께 사용
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans, AgglomerativeClustering, kmeans_plusplus
+from sklearn.metrics import silhouette_score
+
+from embeddings import l2_normalize
+
+
+ALGORITHMS = ("kmeans", "spherical", "minibatch", "agglomerative", "hdbscan")
+
+
+def label_sums(embeddings: np.ndarray, labels: np.ndarray, n_clusters: int) -> np.ndarray:
+    """라벨별 벡터 합 (np.add.at 대신 one-hot 행렬곱으로 계산해 BLAS 사용)"""
+    onehot = np.zeros((n_clusters, embeddings.shape[0]), dtype=embeddings.dtype)
+    onehot[labels, np.arange(embeddings.shape[0])] = 1
+    return onehot @ embeddings
+
+
+def spherical_kmeans(
+    embeddings: np.ndarray, n_clusters: int, max_iter: int = 100,
+    tol: float = 1e-6, init_sample_size: int = 2000,
+    random_state: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    코사인 유사도 기준 k-means (중심을 매번 단위 벡터로 재정규화)
+
+    Returns:
+        (labels, 단위 벡터 중심 배열)
+    """
+    # 초기 중심은 표본에서 k-means++로 선택 (기사가 많아도 초기화 비용 일정)
+    rng = np.random.default_rng(random_state)
+    n = embeddings.shape[0]
+    sample = embeddings[rng.choice(n, init_sample_size, replace=False)] if n > init_sample_size else embeddings
+    centroids, _ = kmeans_plusplus(sample, n_clusters, random_state=random_state)
+    centroids = l2_normalize(centroids)
+    labels = None
+
+    for _ in range(max_iter):
+        new_labels = np.argmax(embeddings @ centroids.T, axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+
+        sums = label_sums(embeddings, labels, n_clusters)
+        # 빈 클러스터는 이전 중심 유지
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        new_centroids = l2_normalize(sums)
+
+        shift = np.abs(new_centroids - centroids).max()
+        centroids = new_centroids
+        if shift < tol:
+            break
+
+    return labels, centroids
+
+
+def cluster_centroids(embeddings: np.ndarray, labels: np.ndarray, n_clusters: int) -> np.ndarray:
+    """라벨별 평균 벡터 (단위 벡터로 정규화)"""
+    return l2_normalize(label_sums(embeddings, labels, n_clusters))
+
+
+def choose_n_clusters(
+    embeddings: np.ndarray, k_min: int = 2, k_max: int = 10,
+    sample_size: int = 1000, random_state: int = 42) -> int:
+    """
+    실루엣 점수(코사인)가 가장 높은 클러스터 수 선택
+
+    기사가 많으면 sample_size개만 뽑아 spherical k-means로 평가해 비용을 제한
+    """
+    n = embeddings.shape[0]
+    k_max = min(k_max, n - 1)
+    if k_max < k_min:
+        return max(1, min(k_min, n))
+
+    if n > sample_size:
+        rng = np.random.default_rng(random_state)
+        embeddings = embeddings[rng.choice(n, sample_size, replace=False)]
+
+    # 정규화된 벡터라 코사인 거리 행렬을 한 번만 계산해 모든 k에 재사용
+    distances = np.clip(1.0 - embeddings @ embeddings.T, 0.0, None)
+    np.fill_diagonal(distances, 0.0)
+
+    best_k, best_score = k_min, -1.0
+    for k in range(k_min, k_max + 1):
+        labels, _ = spherical_kmeans(embeddings, k, random_state=random_state)
+        if len(np.unique(labels)) < 2:
+            continue
+        score = silhouette_score(distances, labels, metric="precomputed")
+        if score > best_score:
+            best_k, best_score = k, score
+    return best_k
+
+
+def cluster_embeddings(
+    embeddings: np.ndarray, n_clusters: Optional[int] = 3,
+    algorithm: str = "kmeans", distance_threshold: float = 0.5,
+    random_state: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    임베딩 클러스터링
+
+    Args:
+        embeddings: L2 정규화된 임베딩 (기사 수 x 차원)
+        n_clusters: 클러스터 수, None이면 자동 선택
+            (kmeans 계열은 실루엣 점수, agglomerative는 distance_threshold 기준,
+            hdbscan은 n_clusters와 관계없이 항상 밀도 기준)
+        algorithm: ALGORITHMS 중 하나
+        distance_threshold: agglomerative에서 n_clusters=None일 때 병합을 멈출 코사인 거리
+
+    Returns:
+        (0부터 연속된 labels, 라벨별 단위 벡터 중심)
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"알 수 없는 클러스터링 알고리즘입니다: {algorithm}")
+
+    n = embeddings.shape[0]
+    if n_clusters is not None:
+        n_clusters = min(n_clusters, n)
+    elif algorithm in ("kmeans", "spherical", "minibatch"):
+        n_clusters = choose_n_clusters(embeddings, random_state=random_state)
+
+    if algorithm == "spherical":
+        labels, _ = spherical_kmeans(embeddings, n_clusters, random_state=random_state)
+    elif algorithm == "kmeans":
+        labels = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10).fit_predict(embeddings)
+    elif algorithm == "minibatch":
+        labels = MiniBatchKMeans(
+            n_clusters=n_clusters, random_state=random_state, n_init=3, batch_size=1024
+        ).fit_predict(embeddings)
+    elif algorithm == "agglomerative":
+        if n < 2:
+            labels = np.zeros(n, dtype=int)
+        else:
+            labels = AgglomerativeClustering(
+                n_clusters=n_clusters,
+                distance_threshold=None if n_clusters else distance_threshold,
+                metric="cosine",
+                linkage="average",
+            ).fit_predict(embeddings)
+    else:
+        from sklearn.cluster import HDBSCAN
+
+        labels = HDBSCAN(min_cluster_size=2).fit_predict(embeddings) if n >= 2 else np.zeros(n, dtype=int)
+        noise = labels < 0
+        if noise.all():
+            labels = np.zeros(n, dtype=int)
+        elif noise.any():
+            n_found = labels.max() + 1
+            centroids = cluster_centroids(embeddings[~noise], labels[~noise], n_found)
+            labels[noise] = np.argmax(embeddings[noise] @ centroids.T, axis=1)
+
+    # 빈 라벨을 없애 0부터 연속되게 맞춤
+    _, labels = np.unique(labels, return_inverse=True)
+    n_found = labels.max() + 1 if n else 0
+    return labels, cluster_centroids(embeddings, labels, n_found)
+
+
+def select_representatives(
+    embeddings: np.ndarray, labels: np.ndarray, centroids: np.ndarray) -> Dict[int, int]:
+    """
+    클러스터마다 중심과 코사인 유사도가 가장 높은 기사 인덱스를 한 번에 계산
+
+    Returns:
+        {라벨: embeddings 내 인덱스}
+    """
+    similarity = np.einsum("ij,ij->i", embeddings, centroids[labels])
+    # 라벨 오름차순, 같은 라벨 안에서는 유사도 내림차순으로 정렬 후 라벨별 첫 번째
+    order = np.lexsort((-similarity, labels))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = labels[order][1:] != labels[order][:-1]
+    return {int(labels[i]): int(i) for i in order[first]}
+
+
+def assign_to_centroids(
+    embeddings: np.ndarray, sums: np.ndarray,
+    distance_threshold: float = 0.35) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    증분 클러스터링: 새 임베딩을 기존 클러스터에 배정하고, 가장 가까운 중심과의
+    코사인 거리가 distance_threshold보다 크면 새 클러스터를 만듦
+
+    Args:
+        embeddings: 새 기사의 L2 정규화된 임베딩
+        sums: 기존 클러스터별 멤버 벡터 합 (label_sums 결과, 클러스터 수 x 차원)
+
+    Returns:
+        (새 기사 labels, 새 멤버를 더한 클러스터별 벡터 합)
+        새 클러스터는 기존 클러스터 뒤에 이어서 번호를 붙임
+    """
+    sums = np.array(sums, dtype=np.float32).reshape(-1, embeddings.shape[1])
+    labels = np.empty(len(embeddings), dtype=int)
+    pending = np.arange(len(embeddings))
+
+    # 기존 클러스터 배정은 행렬곱 한 번으로 처리
+    if len(sums):
+        similarity = embeddings @ l2_normalize(sums).T
+        best = similarity.argmax(axis=1)
+        close = similarity[np.arange(len(embeddings)), best] >= 1 - distance_threshold
+        labels[close] = best[close]
+        sums += label_sums(embeddings[close], best[close], len(sums))
+        pending = np.flatnonzero(~close)
+
+    # 남은 기사끼리는 순서대로 새 클러스터에 모음
+    n_existing = len(sums)
+    new_sums = []
+    for i in pending:
+        if new_sums:
+            similarity = l2_normalize(np.stack(new_sums)) @ embeddings[i]
+            j = int(similarity.argmax())
+            if similarity[j] >= 1 - distance_threshold:
+                new_sums[j] = new_sums[j] + embeddings[i]
+                labels[i] = n_existing + j
+                continue
+        labels[i] = n_existing + len(new_sums)
+        new_sums.append(embeddings[i].astype(np.float32))
+
+    if new_sums:
+        sums = np.vstack([sums, np.stack(new_sums)])
+    return labels, sums
@@ -0,0 +1,144 @@
+"""
+거의 같은 기사 탐지 (MinHash + LSH)
+
+통신사 기사가 여러 언론사에 그대로 재배포되는 경우처럼 본문이 거의 같은 기사를 찾음
+- 본문을 공백 정리 후 글자 n-gram(shingle) 집합으로 보고, MinHash 서명으로 Jaccard 유사도 추정
+  (한국어는 형태소 분석 없이 글자 단위 shingle이 잘 동작)
+- 서명을 band로 나눠 버킷에 넣는 LSH 인덱스로 후보만 비교하므로 전체 쌍을 비교하지 않음
+- 후보는 서명 일치 비율(추정 Jaccard)이 threshold 이상일 때만 중복으로 판단
+"""
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """
+    공백을 정리한 텍스트의 글자 size-gram 집합을 64비트 해시 배열로 변환
+
+    코드포인트 배열에서 다항식 해시를 numpy로 한 번에 계산 (파이썬 반복 없음)
+    """
+    text = ' '.join(text.split())
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < size:
+        codes = np.pad(codes, (0, size - len(codes)))
+
+    n = len(codes) - size + 1
+    hashes = np.zeros(n, dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * _SHINGLE_BASE + codes[offset:offset + n]
+    return np.unique(hashes)
+
+
+def lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (band 수, band당 행 수) 선택
+
+    후보가 되는 유사도 경계 (1/b)^(1/r)가 threshold 이하인 것 중 가장 큰 값을 골라
+    놓치는 중복(false negative)을 줄이고, 잘못 잡힌 후보는 서명 비교로 걸러냄
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """
+    multiply-shift 해시 ((a * x + b) mod 2^64의 상위 32비트) num_perm개로 MinHash 서명 계산
+
+    uint64 곱셈의 wraparound를 그대로 쓰므로 나머지 연산 없이 numpy 연산 한 번으로 계산됨
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True)[:, None] | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64, endpoint=True)[:, None]
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text, self.shingle_size)[None, :]
+        # 임시 배열을 줄이도록 제자리 연산
+        values = self.a * hashes
+        values += self.b
+        values >>= np.uint64(32)
+        return values.min(axis=1).astype(np.uint32)
+
+
+class LSHIndex:
+    """MinHash 서명 band별 버킷 인덱스"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self.rows:(i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def insert(self, key: Hashable, signature: np.ndarray):
+        self._signatures[key] = signature
+        for buckets, band in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(band, []).append(key)
+
+    def query(self, signature: np.ndarray) -> Optional[Hashable]:
+        """추정 Jaccard 유사도가 threshold 이상인 것 중 가장 비슷한 key (없으면 None)"""
+        candidates = set()
+        for buckets, band in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band, ()))
+
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+
+class DuplicateDetector:
+    """
+    텍스트를 하나씩 넣으면서 이미 넣은 것 중 거의 같은 텍스트를 찾음 (스트리밍 처리용)
+
+    Args:
+        threshold: 중복으로 볼 추정 Jaccard 유사도 (0~1)
+        num_perm: MinHash 해시 개수 (클수록 추정이 정확하고 느림)
+        shingle_size: 글자 n-gram 길이
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 5):
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.index = LSHIndex(threshold, num_perm)
+
+    def add(self, key: Hashable, text: str) -> Optional[Hashable]:
+        """
+        중복이면 먼저 넣은 원본 key를 반환하고 인덱스에 넣지 않음, 아니면 넣고 None 반환
+        """
+        signature = self.hasher.signature(text)
+        original = self.index.query(signature)
+        if original is None:
+            self.index.insert(key, signature)
+        return original
+
+
+def find_duplicates(texts: List[str], threshold: float = 0.8, **kwargs) -> List[int]:
+    """
+    텍스트마다 원본 인덱스 반환 (중복이 아니면 자기 자신, 중복이면 앞에 나온 원본)
+    """
+    detector = DuplicateDetector(threshold, **kwargs)
+    originals = []
+    for i, text in enumerate(texts):
+        original = detector.add(i, text)
+        originals.append(i if original is None else original)
+    return originals
@@ -0,0 +1,289 @@
+"""
+임베딩 백엔드와 입력 토큰 계산, 요청 배치 구성, 긴 텍스트 분할
+
+- OpenAIEmbeddingBackend: text-embedding-3-small API (기본값)
+- LocalEmbeddingBackend: CPU에서 도는 sentence-transformers 다국어 모델 (네트워크/요청 제한 없음)
+
+tiktoken이 있으면 실제 토큰 수를 쓰고, 없으면 UTF-8 바이트 수를 상한으로 사용
+(cl100k 토큰은 최소 1바이트라서 바이트 수 ≥ 토큰 수, 글자 수는 드문 한글 음절처럼
+글자 하나가 2~3토큰이 되는 경우가 있어 상한이 아님)
+"""
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from metrics import Metrics, record_usage
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# text-embedding-3-* 모델 제한
+MAX_INPUT_TOKENS = 8191             # 입력 하나당 최대 토큰
+MAX_TOKENS_PER_REQUEST = 300_000    # 요청 하나당 전체 입력 토큰 합
+MAX_INPUTS_PER_REQUEST = 2048       # 요청 하나당 최대 입력 개수
+
+# 한국어를 지원하는 CPU용 소형 다국어 모델 (384차원)
+LOCAL_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+_encoding = None
+_encoding_loaded = False
+
+
+def get_encoding():
+    """cl100k_base 인코딩 (tiktoken이 없거나 인코딩 파일을 받을 수 없으면 None, 한 번만 시도)"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoding = None
+    return _encoding
+
+
+def _utf8_cut(data: bytes, end: int) -> int:
+    """data[:end]가 글자 중간에서 끊기지 않도록 end 이하의 글자 경계 위치 반환"""
+    if end >= len(data):
+        return len(data)
+    # 0b10xxxxxx는 다른 글자의 이어지는 바이트
+    while end > 0 and data[end] & 0xC0 == 0x80:
+        end -= 1
+    return end
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text.encode("utf-8"))
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """앞에서부터 max_tokens 토큰까지만 남김"""
+    encoding = get_encoding()
+    if encoding is None:
+        data = text.encode("utf-8")
+        return data[:_utf8_cut(data, max_tokens)].decode("utf-8")
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """max_tokens 토큰 이하의 조각들로 분할 (순서 유지)"""
+    encoding = get_encoding()
+    if encoding is None:
+        data = text.encode("utf-8")
+        chunks, start = [], 0
+        while start < len(data):
+            # max_tokens가 글자 하나의 바이트 수보다 작아도 최소 한 글자는 담음
+            end = _utf8_cut(data, start + max_tokens)
+            if end <= start:
+                end = _utf8_cut(data, start + 4) if start + 4 < len(data) else len(data)
+            chunks.append(data[start:end].decode("utf-8"))
+            start = end
+        return chunks or [text]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [
+        encoding.decode(tokens[i:i + max_tokens])
+        for i in range(0, len(tokens), max_tokens)
+    ] or [text]
+
+
+def pack_batches(
+    token_counts: List[int], max_tokens: int = MAX_TOKENS_PER_REQUEST,
+    max_inputs: int = MAX_INPUTS_PER_REQUEST) -> List[List[int]]:
+    """
+    입력 순서를 유지하면서 요청당 토큰 합/입력 개수 제한을 넘지 않게 앞에서부터 채워 넣음
+
+    Returns:
+        요청별 입력 인덱스 리스트
+    """
+    batches, batch, batch_tokens = [], [], 0
+    for i, n_tokens in enumerate(token_counts):
+        if batch and (batch_tokens + n_tokens > max_tokens or len(batch) >= max_inputs):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += n_tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def average_chunks(
+    vectors: np.ndarray, owners: List[int], weights: List[int],
+    n_texts: int) -> np.ndarray:
+    """
+    조각별 임베딩을 원래 텍스트별로 토큰 수 가중 평균한 뒤 L2 정규화
+
+    Args:
+        vectors: 조각별 임베딩 (조각 수 x 차원)
+        owners: 조각마다 원래 텍스트 인덱스
+        weights: 조각마다 토큰 수
+        n_texts: 원래 텍스트 수
+    """
+    weighted = vectors * np.asarray(weights, dtype=vectors.dtype)[:, None]
+    sums = np.zeros((n_texts, vectors.shape[1]), dtype=vectors.dtype)
+    np.add.at(sums, owners, weighted)
+    return l2_normalize(sums)
+
+
+def decode_embeddings(data) -> np.ndarray:
+    """
+    임베딩 API 응답 data를 (입력 수 x 차원) float32 배열로 변환
+
+    encoding_format="base64" 응답은 bytes를 이어 붙여 한 번에 np.frombuffer로 읽고,
+    base64를 지원하지 않는 호환 서버가 float 리스트를 주면 그대로 float32로 변환
+    """
+    items = sorted(data, key=lambda item: item.index)
+    if items and isinstance(items[0].embedding, str):
+        raw = bytearray().join(base64.b64decode(item.embedding) for item in items)
+        return np.frombuffer(raw, dtype="<f4").reshape(len(items), -1)
+    return np.asarray([item.embedding for item in items], dtype=np.float32)
+
+
+def l2_normalize(embeddings: np.ndarray) -> np.ndarray:
+    """행마다 L2 정규화한 float32 배열 (정규화 후에는 내적 = 코사인 유사도)"""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return embeddings / norms
+
+
+def reduce_embeddings(embeddings: np.ndarray, n_components: int) -> np.ndarray:
+    """
+    대량 클러스터링용 PCA 차원 축소 (결과는 다시 L2 정규화한 float32)
+
+    기사 수나 원래 차원보다 큰 n_components는 가능한 최대값으로 줄임
+    """
+    from sklearn.decomposition import PCA
+
+    n_components = min(n_components, embeddings.shape[0], embeddings.shape[1])
+    reduced = PCA(
+        n_components=n_components, svd_solver="randomized", random_state=42
+    ).fit_transform(embeddings)
+    return l2_normalize(reduced)
+
+
+class EmbeddingBackend:
+    """
+    임베딩 백엔드 인터페이스
+
+    - model: 캐시 키에 들어가는 모델 이름 (백엔드/모델이 다르면 캐시도 분리됨)
+    - embed(texts): (len(texts) x 차원) numpy 배열 반환, 입력 순서 유지
+    """
+
+    model: str
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """(len(texts) x 차원) float32 배열 반환"""
+        raise NotImplementedError
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """
+    OpenAI 임베딩 API 백엔드
+
+    - 토큰 수 기준으로 요청 배치를 구성 (요청당 토큰 합/입력 개수 제한)
+    - 배치가 여러 개면 concurrency개까지 동시에 요청하고 입력 순서대로 합침
+    - 입력 토큰 제한을 넘는 텍스트는 chunk_tokens가 있으면 나눠서 임베딩 후
+      토큰 수 가중 평균, 없으면 제한 길이로 잘라서 임베딩
+    - 응답은 base64(float32 little-endian)로 받아 파이썬 리스트 없이 바로 float32 배열로 변환
+    """
+
+    def __init__(
+        self, client, model: str = "text-embedding-3-small",
+        concurrency: int = 4, chunk_tokens: Optional[int] = None,
+        metrics: Optional[Metrics] = None):
+        self.client = client
+        self.model = model
+        self.concurrency = concurrency
+        self.chunk_tokens = chunk_tokens
+        self.metrics = metrics or Metrics()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        pieces, owners, weights = [], [], []
+        limit = min(self.chunk_tokens or MAX_INPUT_TOKENS, MAX_INPUT_TOKENS)
+        for i, text in enumerate(texts):
+            n_tokens = count_tokens(text)
+
+            if n_tokens <= limit:
+                chunks, counts = [text], [n_tokens]
+            elif self.chunk_tokens:
+                chunks = chunk_text(text, limit)
+                counts = [count_tokens(chunk) for chunk in chunks]
+            else:
+                chunks, counts = [truncate_tokens(text, limit)], [limit]
+
+            pieces.extend(chunks)
+            owners.extend([i] * len(chunks))
+            weights.extend(counts)
+
+        def request(batch: List[int]) -> np.ndarray:
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=[pieces[j] for j in batch],
+                encoding_format="base64",
+            )
+            record_usage(self.metrics, "embedding", response.usage)
+            return decode_embeddings(response.data)
+
+        batches = pack_batches(weights)
+        if len(batches) == 1 or self.concurrency <= 1:
+            results = [request(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+                results = list(executor.map(request, batches))
+
+        vectors = results[0] if len(results) == 1 else np.concatenate(results)
+        if len(pieces) == len(texts):
+            return vectors
+
+        return average_chunks(vectors, owners, weights, len(texts))
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    sentence-transformers 모델을 CPU에서 돌리는 로컬 백엔드
+
+    - 기본 모델은 LOCAL_EMBEDDING_MODEL
+    - quantize=True면 Linear 레이어를 int8 동적 양자화해 CPU 추론 속도를 높임
+    - 결과는 L2 정규화된 벡터 (코사인 거리 기반 클러스터링과 그대로 호환)
+    """
+
+    def __init__(
+        self, model: str = LOCAL_EMBEDDING_MODEL, batch_size: int = 32, quantize: bool = False):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ValueError(
+                "sentence-transformers 패키지가 설치되지 않았습니다: pip install sentence-transformers"
+            )
+
+        self._model = SentenceTransformer(model, device="cpu")
+        if quantize:
+            import torch
+            self._model = torch.quantization.quantize_dynamic(
+                self._model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+        # 양자화 여부에 따라 결과가 달라지므로 캐시 키도 구분
+        self.model = f"{model}-int8" if quantize else model
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
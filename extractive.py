@@ -0,0 +1,94 @@
+"""
+클러스터 기사들에서 핵심 문장 추출 (map-reduce 요약의 map 단계, LLM 호출 없음)
+
+- 클러스터 모든 기사의 본문을 문장으로 나누고 글자 n-gram TF-IDF 벡터로 표현
+  (한국어는 형태소 분석 없이 글자 n-gram이 잘 동작)
+- 문장 벡터와 클러스터 전체 중심 벡터의 코사인 유사도를 중심성 점수로 사용
+  (모든 문장 쌍 유사도의 합과 같은 순위, 행렬곱 한 번으로 계산)
+- 중심성 높은 순으로 고르되 이미 고른 문장과 너무 비슷한 문장은 건너뛰고 (재배포/인용 반복 제거)
+  token_budget을 넘지 않을 때까지 담음
+- 고른 문장은 기사 순서, 기사 안의 문장 순서대로 다시 정렬해 반환
+"""
+import re
+from typing import List, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from embeddings import count_tokens
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def split_sentences(text: str, min_chars: int = 10) -> List[str]:
+    """문장 부호/줄바꿈 기준으로 나누고 min_chars보다 짧은 조각(기자명, 사진 설명 등)은 버림"""
+    sentences = (' '.join(s.split()) for s in _SENTENCE_END.split(text))
+    return [s for s in sentences if len(s) >= min_chars]
+
+
+def central_sentences(
+    texts: List[str], token_budget: int = 1500, redundancy: float = 0.7,
+    max_sentence_tokens: int = 200) -> List[Tuple[int, str]]:
+    """
+    여러 기사에서 중심성이 높은 문장을 token_budget 안에서 선택
+
+    Args:
+        texts: 클러스터 기사 본문 리스트
+        token_budget: 고른 문장 토큰 수 합의 상한
+        redundancy: 이미 고른 문장과 TF-IDF 코사인 유사도가 이 값 이상이면 건너뜀
+        max_sentence_tokens: 이보다 긴 문장은 후보에서 제외 (표, 나열 등)
+
+    Returns:
+        [(기사 인덱스, 문장), ...] 기사 순서 → 문장 순서
+    """
+    # 재배포/인용으로 똑같은 문장은 처음 나온 것만 사용
+    first_seen = {}
+    for i, text in enumerate(texts):
+        for sentence in split_sentences(text or ''):
+            first_seen.setdefault(sentence, i)
+    if not first_seen:
+        return []
+    sentences = list(first_seen)
+    sources = list(first_seen.values())
+
+    try:
+        # 기본값으로 각 행이 L2 정규화됨
+        matrix = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3)).fit_transform(sentences)
+    except ValueError:
+        # 어휘가 비어 있는 경우 (숫자/기호만 있는 문장 등)
+        return []
+
+    centroid = np.asarray(matrix.mean(axis=0)).ravel()
+    scores = matrix @ centroid
+
+    # 중심성 상위 문장을 예산의 몇 배까지만 후보로 두고, 후보끼리 유사도 행렬을 한 번에 계산
+    pool, tokens, pool_tokens = [], [], 0
+    for index in np.argsort(-scores, kind="stable"):
+        n_tokens = count_tokens(sentences[index])
+        if n_tokens > max_sentence_tokens:
+            continue
+        pool.append(index)
+        tokens.append(n_tokens)
+        pool_tokens += n_tokens
+        if pool_tokens >= token_budget * 4:
+            break
+    if not pool:
+        return []
+    similarity = (matrix[pool] @ matrix[pool].T).toarray()
+
+    chosen, used = [], 0
+    for j, n_tokens in enumerate(tokens):
+        if used + n_tokens > token_budget:
+            continue
+        if chosen and similarity[j, chosen].max() >= redundancy:
+            continue
+        chosen.append(j)
+        used += n_tokens
+        # 남은 예산으로 더 담을 수 있는 짧은 문장이 없으면 종료
+        if token_budget - used < 10:
+            break
+
+    # 문장 인덱스는 기사 순서 → 문장 순서로 매겨져 있음
+    selected = sorted(pool[j] for j in chosen)
+    return [(sources[i], sentences[i]) for i in selected]
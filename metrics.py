@@ -0,0 +1,155 @@
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+logger = logging.getLogger("news_summarizer.metrics")
+
+
+class Metrics:
+    """
+    파이프라인 단계별 소요 시간(span)과 카운터(캐시 적중, HTTP 오류, 재시도, 토큰 사용량 등) 수집
+
+    - span: 이름별 호출 횟수, 누적/최근 소요 시간 (여러 스레드에서 동시에 열릴 수 있어 누적 시간은 wall time보다 클 수 있음)
+    - counter: 이름별 누적 값
+    - log_json=True면 span이 끝날 때마다 JSON 한 줄을 logger로 기록
+    - to_prometheus()로 Prometheus text 포맷 출력, serve()로 /metrics HTTP 엔드포인트 제공
+    """
+
+    def __init__(self, log_json: bool = False):
+        self.log_json = log_json
+        self._lock = threading.Lock()
+        self._spans: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """with 블록의 소요 시간을 name으로 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stat = self._spans.setdefault(
+                    name, {'count': 0, 'total_seconds': 0.0, 'last_seconds': 0.0}
+                )
+                stat['count'] += 1
+                stat['total_seconds'] += elapsed
+                stat['last_seconds'] = elapsed
+
+            if self.log_json:
+                logger.info(json.dumps({
+                    'type': 'span', 'name': name, 'seconds': round(elapsed, 6),
+                    'ts': time.time(),
+                }))
+
+    def incr(self, name: str, value: float = 1):
+        """카운터 name을 value만큼 증가"""
+        if not value:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict:
+        """
+        현재까지의 값 복사본
+
+        Returns:
+            {
+                'spans': {이름: {'count', 'total_seconds', 'last_seconds'}},
+                'counters': {이름: 값},
+            }
+        """
+        with self._lock:
+            return {
+                'spans': {name: dict(stat) for name, stat in self._spans.items()},
+                'counters': dict(self._counters),
+            }
+
+    @staticmethod
+    def diff(after: Dict, before: Dict) -> Dict:
+        """두 snapshot의 차이 (한 번의 실행에 해당하는 값만 보고 싶을 때)"""
+        spans = {}
+        for name, stat in after['spans'].items():
+            prev = before['spans'].get(name, {'count': 0, 'total_seconds': 0.0})
+            count = stat['count'] - prev['count']
+            if count:
+                spans[name] = {
+                    'count': count,
+                    'total_seconds': stat['total_seconds'] - prev['total_seconds'],
+                    'last_seconds': stat['last_seconds'],
+                }
+
+        counters = {}
+        for name, value in after['counters'].items():
+            delta = value - before['counters'].get(name, 0)
+            if delta:
+                counters[name] = delta
+
+        return {'spans': spans, 'counters': counters}
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def to_json(self) -> str:
+        """snapshot을 JSON 한 줄로 반환"""
+        return json.dumps(
+            {'type': 'metrics', 'ts': time.time(), **self.snapshot()},
+            ensure_ascii=False,
+        )
+
+    def to_prometheus(self, prefix: str = "news_summarizer") -> str:
+        """snapshot을 Prometheus text exposition 포맷으로 반환"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_span_seconds_total counter",
+            f"# TYPE {prefix}_span_count_total counter",
+        ]
+        for name, stat in sorted(snapshot['spans'].items()):
+            lines.append(f'{prefix}_span_seconds_total{{span="{name}"}} {stat["total_seconds"]:.6f}')
+            lines.append(f'{prefix}_span_count_total{{span="{name}"}} {stat["count"]}')
+
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9100, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """백그라운드 스레드에서 GET /metrics 로 Prometheus 포맷을 제공하는 서버 시작"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def record_usage(metrics: Metrics, prefix: str, usage):
+    """OpenAI 응답의 usage를 {prefix}_prompt_tokens / {prefix}_completion_tokens 카운터로 기록"""
+    if usage is None:
+        return
+    metrics.incr(f"{prefix}_prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+    metrics.incr(f"{prefix}_completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
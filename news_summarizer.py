@@ -1,26 +1,126 @@
 import os
+import sys
+import json
+import math
+import hashlib
+import argparse
+import time
+import random
+import queue
+import threading
+import multiprocessing
 import requests
 import urllib.parse
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import numpy as np
-from bs4 import BeautifulSoup
-from typing import List, Dict, Tuple
-from openai import OpenAI
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Tuple, Optional, Iterator, Callable
+from openai import APIConnectionError, InternalServerError, OpenAI, RateLimitError
 from dotenv import load_dotenv
-from sklearn.cluster import KMeans
-from sklearn.metrics.pairwise import cosine_distances
+from cache import ArticleCache, ClusterStateStore, EmbeddingCache, SummaryCache
+from metrics import Metrics, record_usage
+from parsers import parse_article, parse_search_results, resolve_backend
+from dedup import DuplicateDetector
+from extractive import central_sentences
+from result_store import ResultStore
+from vector_index import VectorIndex
+from clustering import (
+    ALGORITHMS, assign_to_centroids, cluster_embeddings, label_sums, select_representatives,
+)
+from embeddings import (
+    LOCAL_EMBEDDING_MODEL, EmbeddingBackend, LocalEmbeddingBackend, OpenAIEmbeddingBackend,
+    l2_normalize, reduce_embeddings,
+)
 
 load_dotenv()
 
+# chat completion에서 백오프 후 다시 시도할 오류 (429, 연결 오류, 5xx)
+RETRYABLE_LLM_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+SUMMARY_MODES = ("representative", "mapreduce")
+
+
 class NewsSummarizer:
-    def __init__(self):
+    # 네이버 뉴스 검색 URL (query는 URL 인코딩된 키워드)
+    SEARCH_URL = "https://search.naver.com/search.naver?ssc=tab.news.all&where=news&sm=tab_jum&query={query}"
+    # 검색 결과 한 페이지당 기사 수 (start= 오프셋 계산용)
+    SEARCH_PAGE_SIZE = 10
+    NEWS_DOMAINS = (
+        "news.naver.com",
+        "m.entertain.naver.com",
+        "m.sports.naver.com",
+    )
+
+    def __init__(
+        self, pool_size: int = 16, max_retries: int = 3,
+        cache_dir: Optional[str] = ".cache", max_llm_concurrency: int = 4,
+        metrics: Optional[Metrics] = None, parser: str = "auto",
+        parse_workers: int = 0, embedding_concurrency: int = 4,
+        embedding_chunk_tokens: Optional[int] = None,
+        embedding_backend: Optional[EmbeddingBackend] = None,
+        cluster_dims: Optional[int] = None, cluster_algorithm: str = "kmeans",
+        dedup_threshold: Optional[float] = 0.8, history_dir: Optional[str] = None,
+        summary_mode: str = "representative", summary_token_budget: int = 1500):
+        # 단계별 소요 시간/카운터 수집 (여러 인스턴스가 공유하려면 직접 넘김)
+        self.metrics = metrics or Metrics()
+
+        # HTML 파서 백엔드 ("auto"면 설치된 것 중 가장 빠른 selectolax > lxml > bs4)
+        self.parser = resolve_backend(parser)
+
+        # parse_workers > 0이면 HTML 파싱을 프로세스 풀로 보내 GIL 없이 여러 코어에서 처리
+        # (풀은 처음 쓸 때 만들고 crawl_news 호출 간에 재사용)
+        self.parse_workers = parse_workers
+        self._parse_pool = None
+        self._parse_pool_lock = threading.Lock()
+
+        # 지정하면 본문을 자르지 않고 이 토큰 수 단위로 나눠 임베딩한 뒤 평균 (OpenAI 백엔드)
+        self.embedding_chunk_tokens = embedding_chunk_tokens
+        # 지정하면 기사 수가 많을 때 이 차원으로 PCA 축소 후 클러스터링
+        self.cluster_dims = cluster_dims
+        # 클러스터링 알고리즘 (clustering.ALGORITHMS, 기사가 많으면 "minibatch"/"spherical" 권장)
+        if cluster_algorithm not in ALGORITHMS:
+            raise ValueError(f"알 수 없는 클러스터링 알고리즘입니다: {cluster_algorithm}")
+        self.cluster_algorithm = cluster_algorithm
+        # 본문 추정 Jaccard 유사도가 이 값 이상인 기사는 재배포 기사로 보고 하나로 합침 (None이면 끄기)
+        self.dedup_threshold = dedup_threshold
+        # "representative": 대표 기사 본문 전체를 요약
+        # "mapreduce": 클러스터 모든 기사에서 핵심 문장을 로컬로 뽑아 (map)
+        #   summary_token_budget 토큰 안에 담은 뒤 LLM 한 번으로 요약 (reduce)
+        if summary_mode not in SUMMARY_MODES:
+            raise ValueError(f"알 수 없는 요약 모드입니다: {summary_mode}")
+        self.summary_mode = summary_mode
+        self.summary_token_budget = summary_token_budget
+
         self.headers = {
             "User-Agent": (
                 "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                 "AppleWebKit/537.36 (KHTML, like Gecko) "
                 "Chrome/143.0.0.0 Safari/537.36"
-            )
+            ),
+            # brotli 패키지가 설치되어 있으면 br 포함
+            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+            "Connection": "keep-alive",
         }
 
+        self.session = self._create_session(pool_size, max_retries)
+
+        # cache_dir=None이면 디스크 캐시를 사용하지 않음
+        self.cache_dir = cache_dir
+        self.article_cache = (
+            ArticleCache(os.path.join(cache_dir, "articles.sqlite3"))
+            if cache_dir else None
+        )
+        self.summary_cache = (
+            SummaryCache(os.path.join(cache_dir, "summaries.sqlite3"))
+            if cache_dir else None
+        )
+
         api_key = os.getenv("OPENAI_API_KEY")
 
         if not api_key:
@@ -31,75 +131,272 @@ class NewsSummarizer:
             )
         
         self.client = OpenAI(api_key=api_key)
+        # chat completion 재시도는 _chat_completion이 세마포어 밖에서 직접 하므로 SDK 자체 재시도는 끔
+        # (SDK 재시도는 세마포어를 잡은 채로 대기함, 임베딩 요청은 SDK 기본 재시도 유지)
+        self._chat_client = self.client.with_options(max_retries=0)
+
+        # 임베딩 백엔드 (기본: OpenAI API, 로컬 모델은 LocalEmbeddingBackend를 넘김)
+        self.embedding_backend = embedding_backend or OpenAIEmbeddingBackend(
+            self.client,
+            concurrency=embedding_concurrency,
+            chunk_tokens=embedding_chunk_tokens,
+            metrics=self.metrics,
+        )
+        self.embedding_cache = (
+            EmbeddingCache(cache_dir, self.embedding_backend.model) if cache_dir else None
+        )
+        # run_incremental용 키워드별 클러스터 상태 (cache_dir=None이면 메모리에만 보관)
+        self.cluster_store = ClusterStateStore(
+            os.path.join(cache_dir, "clusters") if cache_dir else None,
+            self.embedding_backend.model,
+        )
+        # 지정하면 실행 결과(기사, 임베딩, 클러스터, 요약)를 이 디렉터리의 컬럼형 저장소에 누적
+        self.result_store = (
+            ResultStore(history_dir, self.embedding_backend.model) if history_dir else None
+        )
+        # 저장된 기사 전체에서 비슷한 기사를 찾는 인덱스 (hnswlib가 없으면 정확한 블록 행렬곱)
+        self.vector_index = VectorIndex(self.result_store) if self.result_store is not None else None
+
+        # 여러 스레드/호출이 동시에 보내는 LLM 요청 수 제한
+        self._llm_semaphore = threading.BoundedSemaphore(max_llm_concurrency)
 
-    def get_news_url(self, keyword: str, max_articles: int) -> List[str]:
+    def _create_session(self, pool_size: int, max_retries: int) -> requests.Session:
+        """
+        검색/기사 요청에 공통으로 쓰는 keep-alive 세션 생성
+
+        Args:
+            pool_size: 호스트별 유지할 커넥션 수 (crawl_news의 max_workers 이상 권장)
+            max_retries: 연결 실패/429/5xx 응답 시 재시도 횟수 (지수 백오프)
+        """
+        metrics = self.metrics
+
+        class CountingRetry(Retry):
+            def increment(self, *args, **kwargs):
+                metrics.incr("http_retries")
+                return super().increment(*args, **kwargs)
+
+        retry = CountingRetry(
+            total=max_retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _chat_completion(self, max_attempts: int = 5, **kwargs):
+        """
+        동시 요청 수를 제한하고 429/연결 오류/5xx 응답 시 지수 백오프로 재시도하는 chat completion 호출
+        """
+        for attempt in range(max_attempts):
+            with self._llm_semaphore:
+                try:
+                    response = self._chat_client.chat.completions.create(**kwargs)
+                    record_usage(self.metrics, "llm", response.usage)
+                    return response
+                except RETRYABLE_LLM_ERRORS as e:
+                    self.metrics.incr(
+                        "llm_rate_limited" if isinstance(e, RateLimitError) else "llm_transient_errors"
+                    )
+                    if attempt == max_attempts - 1:
+                        raise
+            # 세마포어를 반납한 뒤 대기해야 다른 요청이 막히지 않음
+            time.sleep(min(2 ** attempt, 30) + random.uniform(0, 0.5))
+
+    def _chat_completion_stream(
+        self, on_delta: Callable[[str], None], max_attempts: int = 5, **kwargs) -> str:
+        """
+        stream=True로 chat completion을 호출해 토큰 조각마다 on_delta를 부르고 전체 응답 반환
+        (동시 요청 제한/재시도는 _chat_completion과 동일)
+        """
+        for attempt in range(max_attempts):
+            with self._llm_semaphore:
+                try:
+                    stream = self._chat_client.chat.completions.create(
+                        stream=True, stream_options={"include_usage": True}, **kwargs
+                    )
+                except RETRYABLE_LLM_ERRORS as e:
+                    self.metrics.incr(
+                        "llm_rate_limited" if isinstance(e, RateLimitError) else "llm_transient_errors"
+                    )
+                    if attempt == max_attempts - 1:
+                        raise
+                else:
+                    parts = []
+                    for chunk in stream:
+                        # 마지막 chunk에만 usage가 담겨 옴
+                        record_usage(self.metrics, "llm", getattr(chunk, "usage", None))
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            parts.append(delta)
+                            on_delta(delta)
+                    return "".join(parts)
+            time.sleep(min(2 ** attempt, 30) + random.uniform(0, 0.5))
+
+    def _parse(self, func: Callable, *args):
+        """
+        parsers 모듈 함수 실행 (parse_workers > 0이면 프로세스 풀에서 실행하고 결과만 받아옴)
+
+        호출한 크롤링 스레드는 결과를 기다리는 동안 GIL을 놓으므로
+        다른 스레드의 네트워크 요청과 다른 프로세스의 파싱이 동시에 진행됨
+        """
+        if self.parse_workers <= 0:
+            return func(*args)
+
+        pool = self._parse_process_pool()
+        try:
+            return pool.submit(func, *args).result()
+        except BrokenProcessPool:
+            # 작업 프로세스가 죽으면 풀 전체가 못 쓰게 되므로 새 풀로 바꿔 한 번 더 시도
+            self.metrics.incr("parse_pool_restarts")
+            return self._parse_process_pool(broken=pool).submit(func, *args).result()
+
+    def _parse_process_pool(self, broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        """
+        파싱 프로세스 풀 (처음 쓸 때 생성, broken이 현재 풀이면 새로 생성)
+
+        크롤링 스레드들이 락(urllib3 풀, SQLite, metrics)을 잡고 있는 중에 fork하지 않도록
+        forkserver(없는 플랫폼은 spawn)로 작업 프로세스를 띄움
+        """
+        with self._parse_pool_lock:
+            if broken is not None and self._parse_pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._parse_pool = None
+            if self._parse_pool is None:
+                method = (
+                    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+                    else "spawn"
+                )
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context(method),
+                )
+            return self._parse_pool
+
+    def close(self):
+        """보유한 HTTP 커넥션 풀, 파싱 프로세스 풀과 캐시 정리"""
+        self.session.close()
+        with self._parse_pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+        if self.article_cache:
+            self.article_cache.close()
+        if self.summary_cache:
+            self.summary_cache.close()
+
+    def get_news_url(
+        self, keyword: str, max_articles: int,
+        page_concurrency: int = 4, max_pages: Optional[int] = None) -> List[str]:
+        """
+        네이버 뉴스 검색에서 기사 URL 수집
+
+        첫 페이지에서 부족하면 다음 페이지들(start= 오프셋)을 page_concurrency개씩 동시에 요청하고,
+        max_articles개가 모이거나 더 이상 새 URL이 나오지 않으면 중단
+
+        Args:
+            keyword: 검색 키워드
+            max_articles: 최대 기사 수
+            page_concurrency: 한 번에 동시에 요청할 검색 결과 페이지 수
+            max_pages: 최대 검색 결과 페이지 수 (None이면 max_articles 기준으로 계산,
+                네이버뉴스 링크가 없는 결과도 있어 필요한 페이지 수의 두 배 정도로 잡음)
+
+        Returns:
+            검색 결과 순서대로 중복 없는 기사 URL 리스트
+        """
         encoded = urllib.parse.quote(keyword)
-        """네이버 뉴스 검색에서 기사 URL 수집"""
-        url = f"https://search.naver.com/search.naver?ssc=tab.news.all&where=news&sm=tab_jum&query={encoded}"
+        if max_pages is None:
+            max_pages = 2 * math.ceil(max_articles / self.SEARCH_PAGE_SIZE) + 1
 
-        resp = requests.get(url, headers=self.headers, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        news_urls = []
-        
-        domains = [
-            "news.naver.com",
-            "m.entertain.naver.com",
-            "m.sports.naver.com"
-        ]
-        
-        # 기사 리스트 요소
-        for span in soup.select(
-            "span.sds-comps-text.sds-comps-text-ellipsis.sds-comps-text-ellipsis-1"
-        ):
-            text = span.get_text(strip=True)
-            if text != "네이버뉴스":
-                continue
+        def page_url(page: int) -> str:
+            start = page * self.SEARCH_PAGE_SIZE + 1
+            return self.SEARCH_URL.format(query=encoded) + f"&start={start}"
 
-            a_tag = span.find_parent("a")
-            if not a_tag:
-                continue
+        def fetch_page(page: int) -> List[str]:
+            with self.metrics.span("search"):
+                resp = self.session.get(page_url(page), timeout=10)
+                resp.raise_for_status()
+                return self._parse(
+                    parse_search_results, resp.content, self.NEWS_DOMAINS,
+                    self._declared_encoding(resp), self.parser,
+                )
 
-            href = a_tag.get("href")
+        def fetch_next_page(page: int) -> List[str]:
+            # 다음 페이지 요청 실패는 검색 결과 끝으로 취급
+            try:
+                return fetch_page(page)
+            except requests.RequestException:
+                self.metrics.incr("http_errors")
+                return []
 
-            if any(domain in href for domain in domains):
-                if href not in news_urls:
-                    news_urls.append(href)
+        news_urls = []
+        seen = set()
 
-                if len(news_urls)  >= max_articles:
+        def add(urls: List[str]) -> int:
+            added = 0
+            for href in urls:
+                if len(news_urls) >= max_articles:
                     break
+                if href not in seen:
+                    seen.add(href)
+                    news_urls.append(href)
+                    added += 1
+            return added
+
+        # 첫 페이지 요청 실패는 그대로 예외 전달
+        add(fetch_page(0))
+
+        page = 1
+        while len(news_urls) < max_articles and page < max_pages:
+            pages = list(range(page, min(page + page_concurrency, max_pages)))
+            page += len(pages)
+
+            if len(pages) == 1 or page_concurrency <= 1:
+                results = [fetch_next_page(p) for p in pages]
+            else:
+                with ThreadPoolExecutor(max_workers=len(pages)) as executor:
+                    results = list(executor.map(fetch_next_page, pages))
+
+            # 페이지 순서대로 합쳐 검색 결과 순서 유지
+            added = sum(add(urls) for urls in results)
+            if added == 0:
+                break
 
         return news_urls
 
+    @staticmethod
+    def _declared_encoding(resp: requests.Response) -> Optional[str]:
+        """
+        Content-Type 헤더에 charset이 명시된 경우만 인코딩 반환
+        (requests는 charset이 없는 text/*를 ISO-8859-1로 가정하므로 그대로 쓰면 한글이 깨짐)
+        """
+        if "charset" in resp.headers.get("Content-Type", "").lower():
+            return resp.encoding
+        return None
+
     def extract_news_article(self, url: str) -> Dict[str, str]:
-        """BeautifulSoup을 사용하여 기사 텍스트 추출"""
+        """기사 페이지를 받아 self.parser 백엔드로 제목/본문 추출"""
         try:
-            resp = requests.get(url, headers=self.headers, timeout=10)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # 제목 추출
-            title_elem = (
-                soup.select_one("#title_area") or                      # 일반 뉴스
-                soup.select_one('h2.ArticleHead_article_title__qh8GV') # 스포츠/엔터
-            )
-        
-            title = title_elem.get_text(strip=True) if title_elem else None
+            with self.metrics.span("fetch"):
+                resp = self.session.get(url, timeout=10)
+                resp.raise_for_status()
 
-            # 본문 추출
-            article = (
-                soup.select_one("#dic_area") or             # 일반 뉴스
-                soup.select_one("div._article_content")     # 스포츠/엔터
-            )
-            text = None
-
-            if article:
-                for tag in article.find_all(['img', 'script', 'style', 'iframe']):
-                    tag.decompose()
-                        
-                text = article.get_text(separator=' ', strip=True)
-                text = ' '.join(text.split())
+            with self.metrics.span("parse"):
+                title, text = self._parse(
+                    parse_article, resp.content, self._declared_encoding(resp), self.parser
+                )
 
             if not title and not text:
                 return {
@@ -118,6 +415,7 @@ class NewsSummarizer:
             }
         
         except requests.RequestException as e:
+            self.metrics.incr("http_errors")
             return {
                 'url': url,
                 'title': None,
@@ -126,6 +424,7 @@ class NewsSummarizer:
                 'error': f'요청 실패: {str(e)}',
             }
         except Exception as e:
+            self.metrics.incr("parse_errors")
             return {
                 'url': url,
                 'title': None,
@@ -134,23 +433,69 @@ class NewsSummarizer:
                 'error': f'파싱 실패: {str(e)}',
             }
         
-    def crawl_news(self, keyword: str, max_articles: int = 5) -> List[Dict[str, str]]:
+    def iter_articles(
+        self, urls: List[str], max_workers: int = 8) -> Iterator[Tuple[int, Dict]]:
+        """
+        기사 URL들을 동시에 크롤링하면서 완료되는 순서대로 반환
+
+        Args:
+            urls: 기사 URL 리스트
+            max_workers: 동시에 요청할 최대 기사 수 (1이면 순차 실행)
+
+        Yields:
+            (urls 내 인덱스, 기사 정보)
+            캐시에 있는 기사는 네트워크 요청 없이 먼저 반환
+        """
+        missing = []
+        for i, url in enumerate(urls):
+            article = self.article_cache.get(url) if self.article_cache else None
+            if article is None:
+                missing.append(i)
+            else:
+                yield i, article
+
+        if self.article_cache:
+            self.metrics.incr("article_cache_hits", len(urls) - len(missing))
+            self.metrics.incr("article_cache_misses", len(missing))
+
+        if max_workers <= 1 or len(missing) <= 1:
+            for i in missing:
+                article = self.extract_news_article(urls[i])
+                if self.article_cache:
+                    self.article_cache.put(article)
+                yield i, article
+            return
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            futures = {
+                executor.submit(self.extract_news_article, urls[i]): i
+                for i in missing
+            }
+            for future in as_completed(futures):
+                article = future.result()
+                if self.article_cache:
+                    self.article_cache.put(article)
+                yield futures[future], article
+
+    def crawl_news(
+        self, keyword: str, max_articles: int = 5,
+        max_workers: int = 8) -> List[Dict[str, str]]:
         """
         키워드로 뉴스 검색 → 모든 기사 본문 추출
         
         Args:
             keyword: 검색 키워드
             max_articles: 최대 기사 수
+            max_workers: 동시에 요청할 최대 기사 수 (1이면 순차 실행)
         
         Returns:
-            기사 정보 리스트 (제목, 본문, URL 등)
+            기사 정보 리스트 (제목, 본문, URL 등), 검색 결과 순서 유지
         """
         urls = self.get_news_url(keyword, max_articles)
 
-        articles = []
-        for url in urls:
-            result = self.extract_news_article(url)
-            articles.append(result)
+        articles = [None] * len(urls)
+        for i, article in self.iter_articles(urls, max_workers):
+            articles[i] = article
 
         return articles
 
@@ -170,56 +515,132 @@ class NewsSummarizer:
         texts_for_embedding = []
 
         for article in articles:
-            if not article['success']:
-                continue
-            if not article.get('text'):
+            if not self._is_valid_article(article):
                 continue
 
             valid_articles.append(article)
-
-            title = article.get('title') or ''
-            text = article.get('text') or ''
-
-            combined = f"[제목] {title}\n\n[본문] {text[:1500]}"
-            texts_for_embedding.append(combined)
+            texts_for_embedding.append(self._embedding_text(article))
         
         return valid_articles, texts_for_embedding
+
+    def _duplicate_detector(self) -> Optional[DuplicateDetector]:
+        if self.dedup_threshold is None:
+            return None
+        return DuplicateDetector(self.dedup_threshold)
+
+    def dedup_articles(
+        self, articles: List[Dict], texts: List[str],
+        existing: List[Dict] = ()) -> Tuple[List[Dict], List[str]]:
+        """
+        본문이 거의 같은 기사(통신사 재배포 등)를 하나로 합침
+
+        먼저 나온 기사를 남기고, 나머지는 남긴 기사의 'duplicates'에
+        {'title', 'url'}로 붙여 관련 기사 제목으로 보여줄 수 있게 함
+
+        Args:
+            articles, texts: prepare_articles_for_embedding 결과
+            existing: 이미 처리한 기사 ('duplicates' 포함), 이 기사들의 재배포 기사는
+                결과에서 빼고 해당 기사의 'duplicates'에 추가
+
+        Returns:
+            (중복을 뺀 기사 리스트, 같은 순서의 임베딩 텍스트 리스트), existing은 포함하지 않음
+        """
+        detector = self._duplicate_detector()
+        if detector is None:
+            return articles, texts
+
+        kept_articles, kept_texts = list(existing), []
+        with self.metrics.span("dedup"):
+            for i, article in enumerate(existing):
+                detector.add(i, article['text'])
+            for article, text in zip(articles, texts):
+                original = detector.add(len(kept_articles), article['text'])
+                if original is None:
+                    kept_articles.append({**article, 'duplicates': list(article.get('duplicates', []))})
+                    kept_texts.append(text)
+                else:
+                    # dedup을 끄고 저장한 증분 상태의 기사에는 'duplicates'가 없을 수 있음
+                    kept_articles[original].setdefault('duplicates', []).append(
+                        self._duplicate_entry(article)
+                    )
+
+        kept_articles = kept_articles[len(existing):]
+        self.metrics.incr("duplicate_articles", len(articles) - len(kept_articles))
+        return kept_articles, kept_texts
+
+    @staticmethod
+    def _duplicate_entry(article: Dict) -> Dict:
+        return {'title': article['title'], 'url': article['url']}
+
+    @staticmethod
+    def _is_valid_article(article: Dict) -> bool:
+        return bool(article['success'] and article.get('text'))
+
+    def _embedding_text(self, article: Dict) -> str:
+        """
+        임베딩 입력 텍스트 ([제목] ... [본문] ...) 생성
+        (embedding_chunk_tokens가 지정되면 본문 전체, 아니면 본문 앞 1500자)
+        """
+        title = article.get('title') or ''
+        text = article.get('text') or ''
+        if not self.embedding_chunk_tokens:
+            text = text[:1500]
+
+        return f"[제목] {title}\n\n[본문] {text}"
         
     
     def get_embeddings(self, texts: List[str]) -> np.ndarray:
         """
-        기사 텍스트 리스트를 벡터로 변환
+        기사 텍스트 리스트를 embedding_backend로 벡터화 (캐시에 없는 텍스트만 요청)
 
         Args:
             texts: 변환할 텍스트 리스트
 
         Returns:
-            numpy 배열 (texts 개수 x 1536 차원)
+            L2 정규화된 연속 float32 배열 (texts 개수 x 임베딩 차원, OpenAI 기본 모델은 1536)
         """
-        if not self.client:
-            raise ValueError("OpenAI 클라이언트가 초기화되지 않았습니다.")
 
         texts = [t if t else " " for t in texts]
 
-        response = self.client.embeddings.create(
-            model="text-embedding-3-small",
-            input=texts
-        )
+        # 캐시에 없는 텍스트만 API로 요청
+        hits = self.embedding_cache.get_many(texts) if self.embedding_cache else {}
+        missing = [i for i in range(len(texts)) if i not in hits]
+        if self.embedding_cache:
+            self.metrics.incr("embedding_cache_hits", len(hits))
+            self.metrics.incr("embedding_cache_misses", len(missing))
 
-        embeddings = [item.embedding for item in response.data]
-        
-        return np.array(embeddings)
+        fetched = None
+        if missing:
+            with self.metrics.span("embed"):
+                fetched = self.embedding_backend.embed([texts[i] for i in missing])
+
+            if self.embedding_cache:
+                self.embedding_cache.put_many([texts[i] for i in missing], fetched)
+
+        if not hits:
+            return l2_normalize(fetched)
+
+        # 캐시 적중분(memmap view)과 새로 받은 벡터를 하나의 연속된 float32 배열로 합침
+        dim = len(next(iter(hits.values())))
+        embeddings = np.empty((len(texts), dim), dtype=np.float32)
+        for i, vector in hits.items():
+            embeddings[i] = vector
+        if missing:
+            embeddings[missing] = fetched
+
+        return l2_normalize(embeddings)
     
     def cluster_articles(
         self, embeddings: np.ndarray, articles: List[Dict],
-        n_clusters: int = 3) -> List[Dict]:
+        n_clusters: Optional[int] = 3) -> List[Dict]:
         """
         임베딩 벡터를 기반으로 기사들을 클러스터링
 
         Args:
-            embeddings: 임베딩 벡터 배열 (기사 수 x 1536)
+            embeddings: L2 정규화된 임베딩 벡터 배열 (기사 수 x 차원)
+                cluster_dims가 지정되어 있고 기사 수가 그보다 많으면 PCA로 줄여서 클러스터링
             articles: 기사 정보 리스트
-            n_clusters: 클러스터 개수
+            n_clusters: 클러스터 개수 (None이면 cluster_algorithm 기준으로 자동 선택)
 
         Returns:
             클러스터별 기사 정보 리스트
@@ -227,67 +648,77 @@ class NewsSummarizer:
                 {
                     'cluster_id': 0,
                     'articles' : [기사1, 기사2, ...],
-                    'representative': 대표 기사,
+                    'representative': 대표 기사 (클러스터 중심과 코사인 유사도가 가장 높은 기사),
+                    'size': 기사 수
                 },
                 ...
             ]
         """
-        n_clusters = min(n_clusters, len(articles))
-        
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        labels = kmeans.fit_predict(embeddings)
-        
-        clusters = []
-        for cluster_id in range(n_clusters):
-            indices = np.where(labels == cluster_id)[0]
-            
-            if len(indices) == 0:
-                continue
-            
-            cluster_articles = [articles[i] for i in indices]
-            cluster_embeddings = embeddings[indices]
-            
-            centroid = kmeans.cluster_centers_[cluster_id]
-            distances = cosine_distances([centroid], cluster_embeddings)[0]
-            representative_idx = np.argmin(distances)
-            representative = cluster_articles[representative_idx]
-            
-            clusters.append({
+        with self.metrics.span("cluster"):
+            if self.cluster_dims and len(articles) > self.cluster_dims:
+                embeddings = reduce_embeddings(embeddings, self.cluster_dims)
+            labels, centroids = cluster_embeddings(
+                embeddings, n_clusters, algorithm=self.cluster_algorithm
+            )
+            representatives = select_representatives(embeddings, labels, centroids)
+
+        members = [[] for _ in range(len(centroids))]
+        for i, label in enumerate(labels):
+            members[label].append(articles[i])
+
+        return [
+            {
                 'cluster_id': cluster_id,
-                'articles': cluster_articles,
-                'representative': representative,
-                'size': len(cluster_articles)
-            })
-            
-        return clusters
+                'articles': members[cluster_id],
+                'representative': articles[representatives[cluster_id]],
+                'size': len(members[cluster_id])
+            }
+            for cluster_id in range(len(centroids))
+        ]
     
-    def summarize_cluster(self, cluster: Dict) -> Dict:
+    def summarize_cluster(
+        self, cluster: Dict, on_delta: Optional[Callable[[str], None]] = None) -> Dict:
         """
-        클러스터의 대표 기사 요약 + 관련 기사 제목 리스트
+        클러스터 요약 + 관련 기사 제목 리스트
+
+        summary_mode가 "representative"면 대표 기사 본문을, "mapreduce"면 클러스터
+        모든 기사에서 뽑은 핵심 문장(summary_token_budget 토큰 이내)을 요약
+
+        Args:
+            cluster: cluster_articles 결과 중 하나
+            on_delta: 지정하면 요약을 스트리밍으로 받아 토큰 조각마다 호출
+                (캐시된 요약은 한 번에 전달)
         
         Returns:
             {
                 'cluster_id': 클러스터 ID,
                 'size': 기사 개수,
-                'summary': 대표 기사 요약,
+                'summary': 요약,
                 'representative_title': 대표 기사 제목,
                 'related_titles': 관련 기사 제목 리스트
             }
         """
-        representative = cluster['representative']
-        text = representative.get('text', '')
-        
-        # 대표 기사 요약
+        if self.summary_mode == "mapreduce":
+            system_prompt = (
+                "같은 사건을 다룬 여러 뉴스 기사에서 뽑은 핵심 문장들입니다. "
+                "기사들을 종합해 3문장 이내로 핵심만 요약해주세요. "
+                "한국어로 답변하세요."
+            )
+            text = self._cluster_digest(cluster)
+        else:
+            system_prompt = (
+                "뉴스 기사를 3문장 이내로 핵심만 요약해주세요. "
+                "한국어로 답변하세요."
+            )
+            text = cluster['representative'].get('text', '')
+
         if text:
-            response = self.client.chat.completions.create(
+            request = dict(
                 model="gpt-4o-mini",  # 변경
                 messages=[
                     {
                         "role": "system",
-                        "content": (
-                            "뉴스 기사를 3문장 이내로 핵심만 요약해주세요. "
-                            "한국어로 답변하세요."
-                        )
+                        "content": system_prompt
                     },
                     {
                         "role": "user",
@@ -297,16 +728,66 @@ class NewsSummarizer:
                 max_tokens=300,      # 원래대로
                 temperature=0.3      # 원래대로
             )
-            summary = response.choices[0].message.content
+
+            # 같은 본문/프롬프트/파라미터 요청은 캐시된 요약 재사용
+            cache_key = SummaryCache.make_key(request) if self.summary_cache else None
+            summary = self.summary_cache.get(cache_key) if cache_key else None
+            if cache_key:
+                self.metrics.incr(
+                    "summary_cache_hits" if summary is not None else "summary_cache_misses"
+                )
+
+            if summary is None:
+                with self.metrics.span("summarize"):
+                    if on_delta:
+                        summary = self._chat_completion_stream(on_delta, **request)
+                    else:
+                        response = self._chat_completion(**request)
+                        summary = response.choices[0].message.content
+                if cache_key and summary:
+                    self.summary_cache.put(cache_key, summary)
+            elif on_delta:
+                on_delta(summary)
         else:
             summary = "요약할 내용이 없습니다."
+            if on_delta:
+                on_delta(summary)
         
-        # 관련 기사 제목 리스트 (대표 기사 제외)
-        related_titles = [
-            article['title'] 
-            for article in cluster['articles'] 
-            if article['title'] != representative['title']
-        ]
+        return self._cluster_result(cluster, summary)
+
+    def _cluster_digest(self, cluster: Dict) -> str:
+        """
+        클러스터 모든 기사에서 중심성이 높은 문장을 summary_token_budget 안에서 뽑아
+        기사별로 묶은 텍스트 (map 단계, 기사 길이/개수와 관계없이 프롬프트 크기가 고정됨)
+        """
+        with self.metrics.span("extract"):
+            selected = central_sentences(
+                [article.get('text', '') for article in cluster['articles']],
+                self.summary_token_budget,
+            )
+
+        # 기사가 바뀔 때마다 빈 줄로 구분 (제목은 예산 밖이라 넣지 않음)
+        lines, current = [], None
+        for index, sentence in selected:
+            if current is not None and index != current:
+                lines.append('')
+            current = index
+            lines.append(sentence)
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _cluster_result(cluster: Dict, summary: str) -> Dict:
+        """summarize_cluster 결과 형식으로 변환 (요약은 이미 있는 것을 사용)"""
+        representative = cluster['representative']
+
+        # 관련 기사 제목 리스트 (대표 기사 제외, 중복으로 합쳐진 재배포 기사 포함)
+        related_titles = []
+        seen_titles = {representative['title']}
+        for article in cluster['articles']:
+            for title in [article['title']] + [d['title'] for d in article.get('duplicates', [])]:
+                if title not in seen_titles:
+                    seen_titles.add(title)
+                    related_titles.append(title)
         
         return {
             'cluster_id': cluster['cluster_id'],
@@ -317,46 +798,618 @@ class NewsSummarizer:
         }
 
 
-    def summarize_all_clusters(self, clusters: List[Dict]) -> List[Dict]:
-        """모든 클러스터 요약"""
-        results = []
-        for cluster in clusters:
-            result = self.summarize_cluster(cluster)
-            results.append(result)
+    def iter_summaries(
+        self, clusters: List[Dict], max_workers: int = 8,
+        on_delta: Optional[Callable[[int, str], None]] = None) -> Iterator[Tuple[int, Dict]]:
+        """
+        클러스터들을 동시에 요약하면서 완료되는 순서대로 반환
+
+        Args:
+            clusters: cluster_articles 결과
+            max_workers: 동시에 실행할 요약 작업 수 (1이면 순차 실행,
+                실제 API 동시 요청 수는 max_llm_concurrency로 한 번 더 제한됨)
+            on_delta: 지정하면 (cluster_id, 토큰 조각)으로 스트리밍 요약을 전달
+                (여러 스레드에서 호출됨)
+
+        Yields:
+            (clusters 내 인덱스, summarize_cluster 결과)
+        """
+        def summarize(cluster):
+            if on_delta is None:
+                return self.summarize_cluster(cluster)
+            return self.summarize_cluster(
+                cluster, on_delta=lambda delta: on_delta(cluster['cluster_id'], delta)
+            )
+
+        if max_workers <= 1 or len(clusters) <= 1:
+            for i, cluster in enumerate(clusters):
+                yield i, summarize(cluster)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(clusters))) as executor:
+            futures = {
+                executor.submit(summarize, cluster): i
+                for i, cluster in enumerate(clusters)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def summarize_all_clusters(
+        self, clusters: List[Dict], max_workers: int = 8) -> List[Dict]:
+        """모든 클러스터를 동시에 요약 (결과는 clusters 순서 유지)"""
+        results = [None] * len(clusters)
+        for i, result in self.iter_summaries(clusters, max_workers):
+            results[i] = result
         return results
-    
-    def run(self, keyword: str, max_articles: int = 20, n_clusters: int =3) -> List[Dict]:
+
+    def run_stream(
+        self, keyword: str, max_articles: int = 20, n_clusters: Optional[int] = 3,
+        embed_batch_size: int = 8, max_workers: int = 8,
+        stream_tokens: bool = False) -> Iterator[Dict]:
+        """
+        스트리밍 파이프라인: 크롤링이 끝난 기사부터 임베딩 배치로 묶어 바로 요청하고,
+        진행 상황과 부분 결과를 이벤트로 반환
+
+        Args:
+            keyword: 검색 키워드
+            max_articles: 최대 크롤링 기사 수
+            n_clusters: 클러스터 개수 (None이면 자동 선택)
+            embed_batch_size: 임베딩 요청 한 번에 묶을 기사 수
+            max_workers: 동시에 크롤링할 최대 기사 수
+            stream_tokens: True면 요약을 토큰 단위로 스트리밍 (summary_delta 이벤트)
+
+        Yields:
+            {'type': 'urls', 'total': URL 개수}
+            {'type': 'article', 'index': 검색 결과 내 순서, 'article': 기사 정보}
+            {'type': 'embedded', 'done': 임베딩 완료 기사 수, 'total': 유효 기사 수}
+            {'type': 'clusters', 'clusters': cluster_articles 결과}
+            {'type': 'summary_delta', 'cluster_id': 클러스터 ID, 'delta': 요약 토큰 조각} (stream_tokens=True)
+            {'type': 'summary', 'result': summarize_cluster 결과} (완료 순서)
+            {'type': 'done', 'articles': 유효 기사 리스트, 'results': 클러스터 순서의 요약 결과}
+
+            dedup_threshold가 있으면 본문이 거의 같은 기사는 임베딩/클러스터링에서 빼고
+            검색 결과 순서가 가장 앞선 기사의 'duplicates'로만 남김
+            (크롤링 완료 순서와 무관, embedded/done 이벤트의 기사 수도 중복 제외)
+        """
+        urls = self.get_news_url(keyword, max_articles)
+        yield {'type': 'urls', 'total': len(urls)}
+
+        valid = []          # (검색 결과 내 순서, 기사, 임베딩 텍스트), 중복 기사 제외
+        detector = self._duplicate_detector()
+        batch = []
+        embed_futures = {}  # future -> 해당 배치의 (valid 인덱스, 임베딩 텍스트) 리스트
+        embedded = {}       # valid 인덱스 -> 임베딩 벡터
+
+        def collect(futures):
+            for future in futures:
+                for (j, text), vector in zip(embed_futures.pop(future), future.result()):
+                    # 요청 후 더 앞 순위 재배포 기사로 바뀐 자리는 새 텍스트의 결과만 사용
+                    if valid[j][2] == text:
+                        embedded[j] = vector
+
+        with ThreadPoolExecutor(max_workers=2) as embed_executor:
+            def submit(batch):
+                items = [(j, valid[j][2]) for j in batch]
+                future = embed_executor.submit(self.get_embeddings, [text for _, text in items])
+                embed_futures[future] = items
+
+            for index, article in self.iter_articles(urls, max_workers):
+                yield {'type': 'article', 'index': index, 'article': article}
+
+                if self._is_valid_article(article):
+                    original = None
+                    if detector is not None:
+                        with self.metrics.span("dedup"):
+                            original = detector.add(len(valid), article['text'])
+
+                    if original is not None and valid[original][0] < index:
+                        # 재배포 기사는 임베딩하지 않고 검색 순위가 앞선 기사의 관련 기사로만 남김
+                        valid[original][1]['duplicates'].append(self._duplicate_entry(article))
+                        self.metrics.incr("duplicate_articles")
+                    elif original is not None:
+                        # 순위가 더 앞선 재배포 기사가 나중에 도착하면 그 기사를 원본으로 교체하고 다시 임베딩
+                        _, survivor, _ = valid[original]
+                        duplicates = [self._duplicate_entry(survivor)] + survivor['duplicates']
+                        valid[original] = (
+                            index, {**article, 'duplicates': duplicates}, self._embedding_text(article)
+                        )
+                        embedded.pop(original, None)
+                        if original not in batch:
+                            batch.append(original)
+                        self.metrics.incr("duplicate_articles")
+                    else:
+                        batch.append(len(valid))
+                        valid.append((
+                            index, {**article, 'duplicates': []}, self._embedding_text(article)
+                        ))
+                        if len(batch) >= embed_batch_size:
+                            submit(batch)
+                            batch = []
+
+                finished = [f for f in embed_futures if f.done()]
+                if finished:
+                    collect(finished)
+                    yield {'type': 'embedded', 'done': len(embedded), 'total': len(valid)}
+
+            if batch:
+                submit(batch)
+
+            while embed_futures:
+                finished, _ = wait(embed_futures, return_when=FIRST_COMPLETED)
+                collect(finished)
+                yield {'type': 'embedded', 'done': len(embedded), 'total': len(valid)}
+
+        if not valid:
+            yield {'type': 'done', 'articles': [], 'results': []}
+            return
+
+        # 완료 순서와 무관하게 검색 결과 순서로 정렬해 클러스터링 결과를 고정
+        order = sorted(range(len(valid)), key=lambda j: valid[j][0])
+        valid_articles = [valid[j][1] for j in order]
+        ranks = {url: i for i, url in enumerate(urls)}
+        for article in valid_articles:
+            article['duplicates'].sort(key=lambda d: ranks.get(d['url'], len(ranks)))
+        embeddings = np.stack([embedded[j] for j in order])
+
+        clusters = self.cluster_articles(embeddings, valid_articles, n_clusters)
+        yield {'type': 'clusters', 'clusters': clusters}
+
+        # 요약은 백그라운드 스레드에서 진행하고, 토큰 조각/완료 이벤트를 큐로 받아 전달
+        events = queue.Queue()
+
+        def on_delta(cluster_id, delta):
+            events.put({'type': 'summary_delta', 'cluster_id': cluster_id, 'delta': delta})
+
+        def produce():
+            try:
+                for i, result in self.iter_summaries(
+                        clusters, on_delta=on_delta if stream_tokens else None):
+                    events.put((i, result))
+            except Exception as e:
+                events.put(e)
+            finally:
+                events.put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+
+        results = [None] * len(clusters)
+        while (item := events.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            if isinstance(item, dict):
+                yield item
+                continue
+            i, result = item
+            results[i] = result
+            yield {'type': 'summary', 'result': result}
+
+        self._store_run(keyword, valid_articles, embeddings, clusters, results)
+        yield {'type': 'done', 'articles': valid_articles, 'results': results}
+
+    def _store_run(
+        self, keyword: str, articles: List[Dict], embeddings: np.ndarray,
+        clusters: List[Dict], results: List[Dict]):
+        """result_store가 있으면 실행 결과를 append (저장 실패는 카운트만 하고 결과 반환은 계속)"""
+        if self.result_store is None:
+            return
+        try:
+            with self.metrics.span("store"):
+                self.result_store.append_run(keyword, articles, embeddings, clusters, results)
+        except (OSError, ValueError):
+            # ValueError: 저장소와 임베딩 모델/차원이 다른 경우 (예: 기존 history_dir에 --local-embeddings)
+            self.metrics.incr("result_store_errors")
+
+    def related_articles(self, url: str, k: int = 5) -> List[Dict]:
+        """
+        history_dir에 쌓인 과거 기사 중 url 기사와 가장 비슷한 top-k
+
+        Returns:
+            [{'article_id', 'url', 'title', 'keyword', 'fetched_at', 'similarity'}, ...]
+            (history_dir가 없거나 url 기사가 저장되어 있지 않으면 빈 리스트)
+        """
+        if self.vector_index is None:
+            return []
+        with self.metrics.span("related"):
+            self.vector_index.sync()
+            return self.vector_index.related(url, k)
+
+    def run(self, keyword: str, max_articles: int = 20, n_clusters: Optional[int] = 3) -> List[Dict]:
         """
         전체 파이프라인 실행: 크롤링 -> 임베딩 -> 클러스터링 -> 요약
+        (run_stream의 최종 결과만 반환)
 
         Args:
             keyword: 검색 키워드
             max_articles: 최대 크롤링 기사 수
-            n_clusters: 클러스터 개수
+            n_clusters: 클러스터 개수 (None이면 자동 선택)
 
         Returns:
             클러스터별 요약 결과 리스트
         """
-        
-        articles = self.crawl_news(keyword, max_articles)
-        valid_articles, texts = self.prepare_articles_for_embedding(articles)
-        
-        if len(valid_articles) == 0:
+        results = []
+        for event in self.run_stream(keyword, max_articles, n_clusters):
+            if event['type'] == 'done':
+                results = event['results']
+
+        if not results:
             print(f"❌ '{keyword}'에 대한 유효한 뉴스 기사가 없습니다.")
-            return [] 
-        
-        embeddings = self.get_embeddings(texts)
-        clusters = self.cluster_articles(embeddings, valid_articles, n_clusters)
-        results = self.summarize_all_clusters(clusters)
-        
+
         return results
 
-if __name__ == "__main__": 
-    summarizer = NewsSummarizer()
+    def run_record(
+        self, keyword: str, max_articles: int = 20,
+        n_clusters: Optional[int] = 3) -> Dict:
+        """
+        run_stream을 끝까지 실행해 저장/응답용 레코드로 반환
 
-    keyword = input("검색어를 입력하세요: ")
-    results = summarizer.run(keyword, max_articles=20, n_clusters=3)
-    
+        Returns:
+            {
+                'keyword': 키워드,
+                'generated_at': 생성 시각 (ISO 8601),
+                'n_articles': 유효 기사 수,
+                'articles': 유효 기사 리스트,
+                'results': 클러스터별 요약 결과 리스트,
+            }
+        """
+        articles, results = [], []
+        for event in self.run_stream(keyword, max_articles, n_clusters):
+            if event['type'] == 'done':
+                articles, results = event['articles'], event['results']
+        return {
+            'keyword': keyword,
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'n_articles': len(articles),
+            'articles': articles,
+            'results': results,
+        }
+
+    def run_batch(
+        self, keywords: List[str], max_articles: int = 20,
+        n_clusters: Optional[int] = 3, max_workers: int = 8) -> Iterator[Dict]:
+        """
+        여러 키워드를 한 번에 처리하는 배치 파이프라인
+
+        - HTTP 커넥션 풀/기사 캐시/임베딩 캐시를 모든 키워드가 공유
+        - 여러 키워드에 걸쳐 나온 같은 URL은 한 번만 크롤링, 같은 텍스트는 한 번만 임베딩
+        - 모든 키워드의 임베딩 입력을 모아 최대 크기 배치로 요청
+          (실패하면 키워드별로 다시 요청해 실패한 키워드만 오류로 기록)
+        - 모든 키워드의 클러스터를 한꺼번에 동시 요약하고, 키워드 순서대로
+          그 키워드의 요약이 끝나는 대로 바로 반환
+        - 키워드/클러스터 하나의 실패(429 재시도 소진 등)는 그 키워드 결과의 'error'로 기록하고
+          나머지 키워드는 계속 처리
+
+        Args:
+            keywords: 검색 키워드 리스트
+            max_articles: 키워드별 최대 크롤링 기사 수
+            n_clusters: 키워드별 클러스터 개수 (None이면 자동 선택)
+            max_workers: 동시에 크롤링할 최대 기사 수
+
+        Yields:
+            키워드 순서대로
+            {
+                'keyword': 키워드,
+                'generated_at': 생성 시각 (ISO 8601),
+                'n_articles': 유효 기사 수,
+                'results': 클러스터별 요약 결과 리스트 (실패한 클러스터 제외),
+                'error': 실패 내용 (없으면 None),
+            }
+        """
+        errors = {}
+
+        # 1. 키워드별 URL 수집 후 전체 URL 중복 제거
+        keyword_urls = {}
+        unique_urls = []
+        seen = set()
+        for keyword in keywords:
+            try:
+                urls = self.get_news_url(keyword, max_articles)
+            except requests.RequestException as e:
+                self.metrics.incr("http_errors")
+                errors[keyword] = f"검색 실패: {e}"
+                urls = []
+            keyword_urls[keyword] = urls
+            for url in urls:
+                if url not in seen:
+                    seen.add(url)
+                    unique_urls.append(url)
+
+        # 2. 중복 없는 URL 전체를 한 번에 크롤링
+        articles_by_url = {}
+        for i, article in self.iter_articles(unique_urls, max_workers):
+            articles_by_url[unique_urls[i]] = article
+
+        # 3. 전체 유효 기사의 임베딩 텍스트를 중복 없이 모아 한 번에 임베딩
+        keyword_articles = {}
+        unique_texts = {}
+        for keyword in keywords:
+            articles = [articles_by_url[url] for url in keyword_urls[keyword]]
+            valid_articles, texts = self.dedup_articles(
+                *self.prepare_articles_for_embedding(articles)
+            )
+            keyword_articles[keyword] = (valid_articles, texts)
+            for text in texts:
+                unique_texts.setdefault(text, len(unique_texts))
+
+        all_embeddings = None
+        if unique_texts:
+            try:
+                all_embeddings = self.get_embeddings(list(unique_texts))
+            except Exception:
+                # 아래에서 키워드별로 다시 요청
+                self.metrics.incr("batch_embedding_fallbacks")
+
+        # 4. 키워드별 클러스터링
+        keyword_clusters = {}
+        keyword_embeddings = {}
+        all_clusters = []
+        for keyword in keywords:
+            keyword_clusters[keyword] = []
+            valid_articles, texts = keyword_articles[keyword]
+            if not valid_articles:
+                continue
+            try:
+                if all_embeddings is not None:
+                    embeddings = all_embeddings[[unique_texts[text] for text in texts]]
+                else:
+                    embeddings = self.get_embeddings(texts)
+                clusters = self.cluster_articles(embeddings, valid_articles, n_clusters)
+            except Exception as e:
+                self.metrics.incr("batch_keyword_errors")
+                errors[keyword] = f"{type(e).__name__}: {e}"
+                continue
+            keyword_embeddings[keyword] = embeddings
+            keyword_clusters[keyword] = list(
+                range(len(all_clusters), len(all_clusters) + len(clusters))
+            )
+            all_clusters.extend(clusters)
+
+        # 5. 모든 클러스터 요약을 한꺼번에 시작하고 키워드 순서대로 끝나는 대로 반환
+        executor = ThreadPoolExecutor(max_workers=max(1, min(8, len(all_clusters))))
+        try:
+            futures = [executor.submit(self.summarize_cluster, cluster) for cluster in all_clusters]
+            for keyword in keywords:
+                results = []
+                for i in keyword_clusters[keyword]:
+                    try:
+                        results.append(futures[i].result())
+                    except Exception as e:
+                        self.metrics.incr("batch_keyword_errors")
+                        errors.setdefault(keyword, f"{type(e).__name__}: {e}")
+
+                # 일부 클러스터 요약이 실패한 실행은 저장소에 남기지 않음
+                if results and keyword not in errors:
+                    self._store_run(
+                        keyword, keyword_articles[keyword][0], keyword_embeddings[keyword],
+                        [all_clusters[i] for i in keyword_clusters[keyword]], results,
+                    )
+                yield {
+                    'keyword': keyword,
+                    'generated_at': datetime.now(timezone.utc).isoformat(),
+                    'n_articles': len(keyword_articles[keyword][0]),
+                    'results': results,
+                    'error': errors.get(keyword),
+                }
+        finally:
+            # 중간에 소비를 멈추면 남은 요약은 시작하지 않음
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def run_incremental(
+        self, keyword: str, max_articles: int = 20, n_clusters: Optional[int] = 3,
+        distance_threshold: float = 0.35, max_workers: int = 8,
+        max_age: Optional[float] = 3 * 24 * 60 * 60,
+        max_members: Optional[int] = 500) -> List[Dict]:
+        """
+        증분 파이프라인: 같은 키워드를 주기적으로 갱신할 때 새 기사만 처리
+
+        - 이전 실행의 멤버 기사 URL(재배포 기사 포함)은 다시 크롤링/임베딩하지 않음
+        - 새 기사는 기존 클러스터 중심에 배정하고, 가장 가까운 중심과의 코사인 거리가
+          distance_threshold보다 크면 새 클러스터를 만듦
+        - 대표 기사가 바뀐 클러스터(와 새 클러스터)만 다시 요약하고 나머지는 저장된 요약 재사용
+        - 첫 실행(저장된 상태 없음)은 cluster_embeddings로 처음부터 클러스터링
+        - 실행을 시작할 때 추가된 지 max_age초가 지난 멤버와, 최근 max_members개를 넘는 오래된 멤버는 빼고
+          멤버가 남지 않은 클러스터는 없앰 (주기적으로 갱신해도 상태 크기가 일정하게 유지됨)
+
+        같은 키워드의 증분 실행은 cluster_store.lock으로 한 번에 하나만 진행
+        (파라미터가 다른 요청이 동시에 들어와도 서로의 멤버/요약을 덮어쓰지 않음)
+
+        클러스터 번호는 실행 간에 유지되며 (클러스터가 없어지면 남은 클러스터 순서대로 다시 매김),
+        cluster_store.clear(keyword)로 상태를 지울 수 있음
+        증분 상태는 원래 임베딩 공간에서 유지하므로 cluster_dims(PCA)는 쓰지 않음
+
+        Args:
+            keyword: 검색 키워드
+            max_articles: 최대 크롤링 기사 수 (이번 검색 결과 기준)
+            n_clusters: 첫 실행의 클러스터 개수 (None이면 자동 선택)
+            distance_threshold: 새 클러스터를 만드는 코사인 거리
+            max_workers: 동시에 크롤링할 최대 기사 수
+            max_age: 멤버로 유지할 기간(초), None이면 제한 없음
+            max_members: 유지할 최대 멤버 수 (최근 추가된 것 우선), None이면 제한 없음
+
+        Returns:
+            클러스터 번호 순서의 요약 결과 리스트 (summarize_cluster 결과 형식, 전체 멤버 기준)
+        """
+        with self.cluster_store.lock(keyword):
+            return self._run_incremental(
+                keyword, max_articles, n_clusters, distance_threshold, max_workers,
+                max_age, max_members,
+            )
+
+    def _run_incremental(
+        self, keyword: str, max_articles: int, n_clusters: Optional[int],
+        distance_threshold: float, max_workers: int, max_age: Optional[float],
+        max_members: Optional[int]) -> List[Dict]:
+        """run_incremental 본체 (키워드 lock 안에서 호출)"""
+        now = time.time()
+        state = self.cluster_store.load(keyword)
+        if state:
+            state = self._retire_members(state, now, max_age, max_members)
+        old_articles = state['articles'] if state else []
+
+        known_urls = set()
+        for article in old_articles:
+            known_urls.add(article['url'])
+            known_urls.update(d['url'] for d in article.get('duplicates', []))
+
+        urls = [url for url in self.get_news_url(keyword, max_articles) if url not in known_urls]
+        articles = [article for _, article in sorted(self.iter_articles(urls, max_workers))]
+        new_articles, texts = self.dedup_articles(
+            *self.prepare_articles_for_embedding(articles), existing=old_articles
+        )
+        for article in new_articles:
+            article['added_at'] = now
+        self.metrics.incr("incremental_new_articles", len(new_articles))
+
+        if not old_articles and not new_articles:
+            return []
+
+        embeddings = self.get_embeddings(texts) if new_articles else None
+        with self.metrics.span("cluster"):
+            if new_articles:
+                if state:
+                    old_labels = np.asarray(state['labels'])
+                    sums = label_sums(state['vectors'], old_labels, len(state['clusters']))
+                    new_labels, sums = assign_to_centroids(embeddings, sums, distance_threshold)
+                    vectors = np.vstack([state['vectors'], embeddings])
+                    labels = np.concatenate([old_labels, new_labels])
+                else:
+                    vectors = embeddings
+                    labels, _ = cluster_embeddings(
+                        embeddings, n_clusters, algorithm=self.cluster_algorithm
+                    )
+                    sums = label_sums(vectors, labels, labels.max() + 1)
+            else:
+                vectors, labels = state['vectors'], np.asarray(state['labels'])
+                sums = label_sums(vectors, labels, len(state['clusters']))
+
+            all_articles = old_articles + new_articles
+            representatives = select_representatives(vectors, labels, l2_normalize(sums))
+
+        members = [[] for _ in range(len(sums))]
+        for i, label in enumerate(labels):
+            members[label].append(all_articles[i])
+
+        clusters = [
+            {
+                'cluster_id': cluster_id,
+                'articles': members[cluster_id],
+                'representative': all_articles[representatives[cluster_id]],
+                'size': len(members[cluster_id])
+            }
+            for cluster_id in range(len(sums))
+        ]
+
+        # 요약 입력이 그대로인 클러스터는 저장된 요약으로 결과만 다시 구성
+        # (representative 모드는 대표 기사, mapreduce 모드는 멤버 전체가 같아야 재사용)
+        saved = state['clusters'] if state else []
+        results = [None] * len(clusters)
+        changed = []
+        for cluster in clusters:
+            cluster_id = cluster['cluster_id']
+            previous = saved[cluster_id] if cluster_id < len(saved) else None
+            # 'source'가 없는 예전 상태는 대표 기사 URL로 비교
+            source = previous and previous.get('source', previous['representative_url'])
+            if previous and source == self._summary_source(cluster):
+                results[cluster_id] = self._cluster_result(cluster, previous['summary'])
+            else:
+                changed.append(cluster)
+
+        self.metrics.incr("clusters_reused", len(clusters) - len(changed))
+        self.metrics.incr("clusters_resummarized", len(changed))
+        for i, result in self.iter_summaries(changed):
+            results[changed[i]['cluster_id']] = result
+
+        self.cluster_store.save(keyword, {
+            'vectors': vectors,
+            'labels': labels.tolist(),
+            'articles': all_articles,
+            'clusters': [
+                {
+                    'representative_url': cluster['representative']['url'],
+                    'source': self._summary_source(cluster),
+                    'summary': result['summary'],
+                }
+                for cluster, result in zip(clusters, results)
+            ],
+            'updated_at': datetime.now(timezone.utc).isoformat(),
+        })
+        return results
+
+    def _summary_source(self, cluster: Dict) -> str:
+        """
+        클러스터 요약 입력을 나타내는 값 (같으면 저장된 요약 재사용)
+
+        representative 모드는 대표 기사 URL, mapreduce 모드는 모드 + 멤버 URL 집합 해시
+        """
+        if self.summary_mode != "mapreduce":
+            return cluster['representative']['url']
+        urls = sorted(article['url'] for article in cluster['articles'])
+        return "mapreduce:" + hashlib.sha256("\n".join(urls).encode()).hexdigest()
+
+    def _retire_members(
+        self, state: Dict, now: float, max_age: Optional[float],
+        max_members: Optional[int]) -> Optional[Dict]:
+        """
+        증분 상태에서 오래된 멤버와 멤버가 없어진 클러스터를 뺀 상태 반환 (남은 멤버가 없으면 None)
+
+        added_at이 없는 예전 상태의 멤버는 지금 추가된 것으로 봄
+        """
+        articles = state['articles']
+        added_at = np.array([article.setdefault('added_at', now) for article in articles])
+        keep = np.ones(len(articles), dtype=bool)
+        if max_age is not None:
+            keep &= added_at >= now - max_age
+        if max_members is not None and keep.sum() > max_members:
+            # 멤버는 추가된 순서로 쌓이므로 뒤쪽 max_members개가 가장 최근 것
+            keep[np.flatnonzero(keep)[:-max_members]] = False
+
+        retired = len(articles) - int(keep.sum())
+        if not retired:
+            return state
+        self.metrics.incr("incremental_retired_articles", retired)
+        if not keep.any():
+            return None
+
+        labels = np.asarray(state['labels'])[keep]
+        remaining = np.unique(labels)
+        self.metrics.incr("incremental_retired_clusters", len(state['clusters']) - len(remaining))
+        # 남은 클러스터 번호를 0부터 다시 매김 (순서 유지)
+        renumber = np.full(len(state['clusters']), -1)
+        renumber[remaining] = np.arange(len(remaining))
+        return {
+            **state,
+            'vectors': np.asarray(state['vectors'])[keep],
+            'labels': renumber[labels].tolist(),
+            'articles': [article for article, kept in zip(articles, keep) if kept],
+            'clusters': [state['clusters'][label] for label in remaining],
+        }
+
+
+def read_keywords(path: str) -> List[str]:
+    """키워드 파일 읽기 (한 줄에 하나, 빈 줄과 #으로 시작하는 줄은 무시, 중복 제거)"""
+    with open(path, encoding="utf-8") as f:
+        stripped = (line.strip() for line in f)
+        # dict는 삽입 순서를 유지하므로 처음 나온 순서대로 중복 제거
+        return list(dict.fromkeys(k for k in stripped if k and not k.startswith("#")))
+
+
+def write_jsonl(records: Iterator[Dict], path: str) -> int:
+    """배치 결과를 JSON Lines로 저장하고 저장한 줄 수 반환 ("-"면 표준 출력)"""
+    out = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+    count = 0
+    try:
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # 키워드가 끝날 때마다 바로 파일에 남김 (중간에 중단되어도 끝난 키워드는 보존)
+            out.flush()
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count
+
+
+def print_results(results: List[Dict]):
     for result in results:
         print(f"\n{'='*60}")
         print(f"[그룹 {result['cluster_id'] + 1}] - {result['size']}개 기사")
@@ -368,7 +1421,69 @@ if __name__ == "__main__":
             print(f"\n🔗 관련 기사:")
             for title in result['related_titles']:
                 print(f"   - {title}")
-    
-    
-   
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="네이버 뉴스 클러스터링 요약")
+    parser.add_argument("--batch", metavar="KEYWORDS_FILE",
+                        help="키워드 파일 (한 줄에 하나), 지정하면 배치 모드로 실행")
+    parser.add_argument("--out", default="-", help="배치 결과 JSONL 경로 (기본: 표준 출력)")
+    parser.add_argument("--max-articles", type=int, default=20)
+    parser.add_argument("--clusters", type=lambda v: None if v == "auto" else int(v), default=3,
+                        help="클러스터 개수 (auto면 자동 선택)")
+    parser.add_argument("--cluster-algorithm", choices=ALGORITHMS, default="kmeans",
+                        help="클러스터링 알고리즘 (기사가 많으면 minibatch/spherical 권장)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="이전 실행의 클러스터에 새 기사만 배정하고 바뀐 클러스터만 다시 요약")
+    parser.add_argument("--dedup-threshold", type=float, default=0.8,
+                        help="재배포 기사로 합칠 본문 유사도 (0이면 중복 제거 안 함)")
+    parser.add_argument("--history-dir", help="실행 결과를 누적할 컬럼형 저장소 디렉터리")
+    parser.add_argument("--summary-mode", choices=SUMMARY_MODES, default="representative",
+                        help="mapreduce면 클러스터 모든 기사의 핵심 문장을 모아 요약")
+    parser.add_argument("--summary-token-budget", type=int, default=1500,
+                        help="mapreduce 모드에서 클러스터당 요약 입력 토큰 상한")
+    parser.add_argument("--local-embeddings", nargs="?", const=LOCAL_EMBEDDING_MODEL,
+                        metavar="MODEL", help="OpenAI 대신 CPU 로컬 sentence-transformers 모델로 임베딩")
+    parser.add_argument("--quantize", action="store_true",
+                        help="로컬 임베딩 모델을 int8 동적 양자화")
+    args = parser.parse_args()
+
+    backend = None
+    if args.local_embeddings:
+        backend = LocalEmbeddingBackend(args.local_embeddings, quantize=args.quantize)
+
+    summarizer = NewsSummarizer(
+        embedding_backend=backend, cluster_algorithm=args.cluster_algorithm,
+        dedup_threshold=args.dedup_threshold or None, history_dir=args.history_dir,
+        summary_mode=args.summary_mode, summary_token_budget=args.summary_token_budget,
+    )
+
+    def incremental_record(keyword):
+        try:
+            results, error = summarizer.run_incremental(keyword, args.max_articles, args.clusters), None
+        except Exception as e:
+            results, error = [], f"{type(e).__name__}: {e}"
+        return {
+            'keyword': keyword,
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'results': results,
+            'error': error,
+        }
+
+    if args.batch and args.incremental:
+        records = (incremental_record(keyword) for keyword in read_keywords(args.batch))
+        count = write_jsonl(records, args.out)
+        print(f"✅ {count}개 키워드 처리 완료", file=sys.stderr)
+    elif args.batch:
+        records = summarizer.run_batch(
+            read_keywords(args.batch), args.max_articles, args.clusters
+        )
+        count = write_jsonl(records, args.out)
+        print(f"✅ {count}개 키워드 처리 완료", file=sys.stderr)
+    else:
+        keyword = input("검색어를 입력하세요: ")
+        if args.incremental:
+            print_results(summarizer.run_incremental(keyword, args.max_articles, args.clusters))
+        else:
+            print_results(summarizer.run(keyword, args.max_articles, args.clusters))
     
\ No newline at end of file
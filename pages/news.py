@@ -1,4 +1,8 @@
+import os
+import time
 import streamlit as st
+from result_store import ResultStore
+from vector_index import VectorIndex
 
 st.set_page_config(page_title="News Articles", layout="wide")
 
@@ -58,6 +62,22 @@ if 'results' not in st.session_state or not st.session_state.results:
 
 results = st.session_state.results
 
+
+@st.cache_resource
+def get_vector_index(history_dir):
+    """NEWS_HISTORY_DIR에 쌓인 과거 기사 검색 인덱스 (pyarrow가 없으면 None)"""
+    try:
+        return VectorIndex(ResultStore(history_dir))
+    except ValueError:
+        return None
+
+
+vector_index = None
+if os.getenv("NEWS_HISTORY_DIR"):
+    vector_index = get_vector_index(os.getenv("NEWS_HISTORY_DIR"))
+    if vector_index is not None:
+        vector_index.sync()
+
 # Top stats
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -78,8 +98,50 @@ with col3:
     if st.button("🔍 New Search", type="primary", use_container_width=True):
         st.switch_page("app.py")
 
+# Precomputed results show how old they are
+if results.get('generated_at'):
+    age_minutes = int((time.time() - results['generated_at']) // 60)
+    status = f"🕒 Precomputed {age_minutes} min ago"
+    if results.get('stale'):
+        st.warning(status + " · a fresh version is being computed in the background")
+    else:
+        st.caption(status)
+
 st.divider()
 
+# Timing breakdown for the last search
+if results.get('metrics'):
+    with st.expander("⏱️ Timing breakdown"):
+        spans = results['metrics']['spans']
+        st.caption("Cumulative time per stage (concurrent stages can exceed wall time)")
+        st.table([
+            {
+                'stage': name,
+                'calls': stat['count'],
+                'total (s)': round(stat['total_seconds'], 3),
+                'avg (ms)': round(stat['total_seconds'] / stat['count'] * 1000, 1),
+            }
+            for name, stat in spans.items()
+        ])
+        if results['metrics']['counters']:
+            st.json(results['metrics']['counters'])
+
+# Cluster summaries
+if results.get('clusters'):
+    st.markdown("## 🧩 Story Clusters")
+    for cluster in results['clusters']:
+        with st.container(border=True):
+            st.markdown(
+                f"**[Group {cluster['cluster_id'] + 1}] {cluster['representative_title']}** "
+                f"· {cluster['size']} articles"
+            )
+            st.write(cluster['summary'])
+            if cluster['related_titles']:
+                with st.expander("🔗 Related articles"):
+                    for title in cluster['related_titles']:
+                        st.markdown(f"- {title}")
+    st.divider()
+
 # Display articles in card layout
 for idx, (article, text) in enumerate(zip(results['articles'], results['texts']), 1):
     # Create card container
@@ -119,6 +181,20 @@ for idx, (article, text) in enumerate(zip(results['articles'], results['texts'])
             # Link to original
             if article.get('url'):
                 st.markdown(f'<a href="{article["url"]}" target="_blank" class="news-link">🔗 Read Original</a>', unsafe_allow_html=True)
+
+            # Same story syndicated by other outlets (merged before embedding)
+            if article.get('duplicates'):
+                st.caption(f"🗞️ Also reported by {len(article['duplicates'])} other outlets")
+                for duplicate in article['duplicates']:
+                    st.markdown(f"- [{duplicate['title']}]({duplicate['url']})")
+
+            # Similar coverage from earlier searches
+            related = vector_index.related(article['url']) if vector_index and article.get('url') else []
+            if related:
+                with st.expander("🕰️ Related coverage from history"):
+                    for item in related:
+                        st.markdown(f"- [{item['title']}]({item['url']})")
+                        st.caption(f"{item['keyword']} · similarity {item['similarity']:.2f}")
             
             # Action buttons
             st.markdown("<br>", unsafe_allow_html=True)
@@ -0,0 +1,266 @@
+"""
+네이버 검색 결과/기사 HTML 파서
+
+응답 bytes를 그대로 받아 디코딩 과정 없이 파싱하며, 백엔드를 선택할 수 있음
+- "selectolax": C 기반 (lexbor), 가장 빠름
+- "lxml": C 기반 (libxml2)
+- "bs4": BeautifulSoup + html.parser (순수 파이썬, 추가 의존성 없음)
+- "auto": 설치된 것 중 가장 빠른 백엔드
+
+process pool에 넘길 수 있도록 모든 함수는 모듈 최상위에 정의
+"""
+import re
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+
+TITLE_SELECTORS = (
+    "#title_area",                              # 일반 뉴스
+    "h2.ArticleHead_article_title__qh8GV",      # 스포츠/엔터
+)
+BODY_SELECTORS = (
+    "#dic_area",                                # 일반 뉴스
+    "div._article_content",                     # 스포츠/엔터
+)
+REMOVED_TAGS = ("img", "script", "style", "iframe")
+SEARCH_SPAN_SELECTOR = "span.sds-comps-text.sds-comps-text-ellipsis.sds-comps-text-ellipsis-1"
+NAVER_NEWS_LABEL = "네이버뉴스"
+
+# CSS 선택자와 같은 의미의 XPath (lxml은 cssselect 없이 XPath만 사용)
+TITLE_XPATHS = (
+    "//*[@id='title_area']",
+    "//h2[contains(concat(' ', normalize-space(@class), ' '), ' ArticleHead_article_title__qh8GV ')]",
+)
+BODY_XPATHS = (
+    "//*[@id='dic_area']",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' _article_content ')]",
+)
+SEARCH_SPAN_XPATH = (
+    "//span[contains(concat(' ', normalize-space(@class), ' '), ' sds-comps-text ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' sds-comps-text-ellipsis ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' sds-comps-text-ellipsis-1 ')]"
+)
+
+
+def available_backends() -> List[str]:
+    """설치된 파서 백엔드 (빠른 순)"""
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    if lxml is not None:
+        backends.append("lxml")
+    backends.append("bs4")
+    return backends
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    """"auto"를 실제 백엔드 이름으로 바꾸고, 설치되지 않은 백엔드면 ValueError"""
+    if backend == "auto":
+        return available_backends()[0]
+    if backend not in ("selectolax", "lxml", "bs4"):
+        raise ValueError(f"알 수 없는 파서 백엔드입니다: {backend}")
+    if backend not in available_backends():
+        raise ValueError(f"{backend} 패키지가 설치되지 않았습니다: pip install {backend}")
+    return backend
+
+
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_-]+)""", re.IGNORECASE)
+
+
+def sniff_encoding(content: bytes, encoding: Optional[str] = None) -> str:
+    """
+    HTTP 헤더 인코딩 → 문서 앞부분 meta charset → UTF-8(네이버 기본) 순으로 인코딩 결정
+    """
+    if encoding:
+        return encoding
+    match = META_CHARSET_RE.search(content[:2048])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def _normalize(text: str) -> Optional[str]:
+    return ' '.join(text.split()) or None
+
+
+# ---------------------------------------------------------------- 기사 본문
+
+def _parse_article_bs4(content: bytes, encoding: Optional[str]):
+    soup = BeautifulSoup(content, "html.parser", from_encoding=sniff_encoding(content, encoding))
+
+    title_elem = None
+    for selector in TITLE_SELECTORS:
+        title_elem = soup.select_one(selector)
+        if title_elem:
+            break
+    title = title_elem.get_text(strip=True) if title_elem else None
+
+    article = None
+    for selector in BODY_SELECTORS:
+        article = soup.select_one(selector)
+        if article:
+            break
+
+    text = None
+    if article:
+        for tag in article.find_all(list(REMOVED_TAGS)):
+            tag.decompose()
+        text = _normalize(article.get_text(separator=' ', strip=True))
+
+    return title or None, text
+
+
+def _parse_article_lxml(content: bytes, encoding: Optional[str]):
+    parser = lxml.html.HTMLParser(encoding=sniff_encoding(content, encoding))
+    root = lxml.html.document_fromstring(content, parser=parser)
+
+    def first(xpaths):
+        for xpath in xpaths:
+            found = root.xpath(xpath)
+            if found:
+                return found[0]
+        return None
+
+    title_elem = first(TITLE_XPATHS)
+    title = (
+        ''.join(s.strip() for s in title_elem.itertext())
+        if title_elem is not None else None
+    )
+
+    article = first(BODY_XPATHS)
+    text = None
+    if article is not None:
+        for tag in article.xpath(" | ".join(f".//{name}" for name in REMOVED_TAGS)):
+            # drop_tree는 태그 뒤의 텍스트(tail)를 남겨 bs4 decompose와 결과가 같음
+            tag.drop_tree()
+        text = _normalize(' '.join(article.itertext()))
+
+    return title or None, text
+
+
+def _selectolax_tree(content: bytes, encoding: Optional[str]):
+    # lexbor는 bytes를 UTF-8로 해석하므로 다른 인코딩만 미리 디코딩
+    encoding = sniff_encoding(content, encoding)
+    if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+        content = content.decode(encoding, errors="replace")
+    return LexborHTMLParser(content)
+
+
+def _parse_article_selectolax(content: bytes, encoding: Optional[str]):
+    tree = _selectolax_tree(content, encoding)
+
+    def first(selectors):
+        for selector in selectors:
+            node = tree.css_first(selector)
+            if node is not None:
+                return node
+        return None
+
+    title_elem = first(TITLE_SELECTORS)
+    title = (
+        title_elem.text(deep=True, separator='', strip=True)
+        if title_elem is not None else None
+    )
+
+    article = first(BODY_SELECTORS)
+    text = None
+    if article is not None:
+        for node in article.css(", ".join(REMOVED_TAGS)):
+            node.decompose()
+        text = _normalize(article.text(deep=True, separator=' ', strip=True))
+
+    return title or None, text
+
+
+_ARTICLE_PARSERS = {
+    "bs4": _parse_article_bs4,
+    "lxml": _parse_article_lxml,
+    "selectolax": _parse_article_selectolax,
+}
+
+
+def parse_article(
+    content: bytes, encoding: Optional[str] = None,
+    backend: str = "bs4") -> Tuple[Optional[str], Optional[str]]:
+    """
+    기사 HTML에서 (제목, 본문) 추출
+
+    Args:
+        content: 응답 본문 bytes
+        encoding: HTTP 헤더에 명시된 인코딩 (없으면 None, meta charset 또는 UTF-8로 판단)
+        backend: resolve_backend로 확정된 백엔드 이름
+
+    Returns:
+        (제목, 공백 정리된 본문), 찾지 못한 항목은 None
+    """
+    return _ARTICLE_PARSERS[backend](content, encoding)
+
+
+# ---------------------------------------------------------------- 검색 결과
+
+def _search_results_bs4(content: bytes, encoding: Optional[str]):
+    soup = BeautifulSoup(content, "html.parser", from_encoding=sniff_encoding(content, encoding))
+    hrefs = []
+    for span in soup.select(SEARCH_SPAN_SELECTOR):
+        if span.get_text(strip=True) != NAVER_NEWS_LABEL:
+            continue
+        a_tag = span.find_parent("a")
+        if a_tag:
+            hrefs.append(a_tag.get("href"))
+    return hrefs
+
+
+def _search_results_lxml(content: bytes, encoding: Optional[str]):
+    parser = lxml.html.HTMLParser(encoding=sniff_encoding(content, encoding))
+    root = lxml.html.document_fromstring(content, parser=parser)
+    hrefs = []
+    for span in root.xpath(SEARCH_SPAN_XPATH):
+        if ''.join(s.strip() for s in span.itertext()) != NAVER_NEWS_LABEL:
+            continue
+        a_tag = next(span.iterancestors("a"), None)
+        if a_tag is not None:
+            hrefs.append(a_tag.get("href"))
+    return hrefs
+
+
+def _search_results_selectolax(content: bytes, encoding: Optional[str]):
+    tree = _selectolax_tree(content, encoding)
+    hrefs = []
+    for span in tree.css(SEARCH_SPAN_SELECTOR):
+        if span.text(deep=True, separator='', strip=True) != NAVER_NEWS_LABEL:
+            continue
+        node = span.parent
+        while node is not None and node.tag != "a":
+            node = node.parent
+        if node is not None:
+            hrefs.append(node.attributes.get("href"))
+    return hrefs
+
+
+_SEARCH_PARSERS = {
+    "bs4": _search_results_bs4,
+    "lxml": _search_results_lxml,
+    "selectolax": _search_results_selectolax,
+}
+
+
+def parse_search_results(
+    content: bytes, domains: Tuple[str, ...], encoding: Optional[str] = None,
+    backend: str = "bs4") -> List[str]:
+    """
+    검색 결과 페이지 HTML에서 "네이버뉴스" 링크 중 domains에 속한 기사 URL 추출 (페이지 내 순서 유지)
+    """
+    return [
+        href
+        for href in _SEARCH_PARSERS[backend](content, encoding)
+        if href and any(domain in href for domain in domains)
+    ]
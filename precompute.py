@@ -0,0 +1,211 @@
+"""
+자주 찾는 키워드의 요약 결과를 백그라운드에서 미리 계산하는 스케줄러 (stale-while-revalidate)
+
+- 설정한 키워드와 최근(trending_window) 많이 요청된 키워드를 주기적으로 다시 계산해 ResultCache에 저장
+  (그 기간에 요청이 없던 키워드는 더 이상 갱신하지 않음)
+- get()은 저장된 결과를 바로 반환하고, refresh_after보다 오래된 결과면
+  백그라운드에서 다시 계산을 시작 (기다리지 않음)
+- 같은 키워드의 재계산은 한 번에 하나만 실행
+
+사용법:
+    scheduler = PrecomputeScheduler(NewsSummarizer(), keywords=["반도체", "금리"])
+    scheduler.start()
+    cached = scheduler.get("반도체")   # None이면 직접 실행 후 scheduler.put(...)
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cache import ResultCache
+from news_summarizer import NewsSummarizer
+
+
+logger = logging.getLogger("news_summarizer.precompute")
+
+
+class PrecomputeScheduler:
+    """
+    Args:
+        summarizer: 계산에 쓸 NewsSummarizer (스케줄러 전용 인스턴스 권장)
+        keywords: 항상 미리 계산할 키워드
+        store: 결과 저장소 (없으면 summarizer.cache_dir/results.sqlite3, cache_dir=None이면 메모리)
+        refresh_after: 이 시간(초)보다 오래된 결과는 stale로 보고 다시 계산
+        interval: 백그라운드 루프가 키워드를 확인하는 주기(초)
+        max_articles, n_clusters: 설정한 키워드를 계산할 때의 파라미터
+        trending_limit: 설정한 키워드 외에 최근 요청 수 상위 몇 개를 함께 갱신할지
+        trending_window: 최근 요청 수를 셀 기간(초), 이보다 오래된 요청은 세지 않음
+        max_workers: 동시에 재계산할 키워드 수
+    """
+
+    def __init__(
+        self, summarizer: NewsSummarizer, keywords: Iterable[str] = (),
+        store: Optional[ResultCache] = None, refresh_after: float = 10 * 60,
+        interval: float = 60, max_articles: int = 20, n_clusters: Optional[int] = 3,
+        trending_limit: int = 10, trending_window: float = 60 * 60, max_workers: int = 2):
+        self.summarizer = summarizer
+        self.keywords = [keyword.strip() for keyword in keywords if keyword.strip()]
+        if store is None:
+            path = (
+                os.path.join(summarizer.cache_dir, "results.sqlite3")
+                if summarizer.cache_dir else ":memory:"
+            )
+            store = ResultCache(path)
+        self.store = store
+        self.refresh_after = refresh_after
+        self.interval = interval
+        self.max_articles = max_articles
+        self.n_clusters = n_clusters
+        self.trending_limit = trending_limit
+        self.trending_window = trending_window
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="precompute")
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        # (키워드, max_articles) → 요청 시각 deque (trending_window 안의 것만 유지)
+        self._requests: Dict[Tuple[str, int], deque] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _key(self, keyword: str, max_articles: int) -> str:
+        return ResultCache.make_key(keyword, max_articles=max_articles, n_clusters=self.n_clusters)
+
+    def get(self, keyword: str, max_articles: Optional[int] = None) -> Optional[Dict]:
+        """
+        저장된 결과를 바로 반환하고, stale이면 백그라운드 재계산 시작
+
+        Returns:
+            없으면 None, 있으면
+            {
+                'record': NewsSummarizer.run_record 결과,
+                'generated_at': 생성 시각 (epoch 초),
+                'age': 생성 후 지난 시간(초),
+                'stale': refresh_after보다 오래되었는지,
+                'refreshing': 백그라운드에서 다시 계산 중인지,
+            }
+        """
+        keyword = keyword.strip()
+        max_articles = max_articles or self.max_articles
+        with self._lock:
+            self._requests.setdefault((keyword, max_articles), deque()).append(time.time())
+
+        cached = self.store.get(self._key(keyword, max_articles))
+        if cached is None:
+            self.summarizer.metrics.incr("precompute_misses")
+            return None
+
+        record, generated_at = cached
+        age = time.time() - generated_at
+        stale = age > self.refresh_after
+        self.summarizer.metrics.incr("precompute_stale_hits" if stale else "precompute_hits")
+        if stale:
+            self.refresh_async(keyword, max_articles)
+
+        return {
+            'record': record,
+            'generated_at': generated_at,
+            'age': age,
+            'stale': stale,
+            'refreshing': self.is_refreshing(keyword, max_articles),
+        }
+
+    def put(self, keyword: str, record: Dict, max_articles: Optional[int] = None):
+        """다른 곳에서 직접 계산한 결과 저장 (다음 요청부터 바로 반환)"""
+        self.store.put(self._key(keyword, max_articles or self.max_articles), record)
+
+    def is_refreshing(self, keyword: str, max_articles: Optional[int] = None) -> bool:
+        with self._lock:
+            return (keyword.strip(), max_articles or self.max_articles) in self._refreshing
+
+    def refresh(self, keyword: str, max_articles: Optional[int] = None) -> Dict:
+        """키워드 결과를 지금 다시 계산해 저장 (블로킹)"""
+        keyword = keyword.strip()
+        max_articles = max_articles or self.max_articles
+        with self.summarizer.metrics.span("precompute"):
+            record = self.summarizer.run_record(keyword, max_articles, self.n_clusters)
+        # 결과가 비었으면 이전 결과를 덮어쓰지 않음 (일시적인 검색/크롤링 실패 대비)
+        if record['results']:
+            self.store.put(self._key(keyword, max_articles), record)
+        return record
+
+    def refresh_async(self, keyword: str, max_articles: Optional[int] = None) -> bool:
+        """
+        백그라운드 재계산 시작
+
+        Returns:
+            새로 시작했으면 True, 같은 키워드가 이미 계산 중이면 False
+        """
+        job = (keyword.strip(), max_articles or self.max_articles)
+        with self._lock:
+            if job in self._refreshing:
+                return False
+            self._refreshing.add(job)
+
+        def run():
+            try:
+                self.refresh(*job)
+            except Exception:
+                self.summarizer.metrics.incr("precompute_errors")
+                logger.exception("precompute failed: %s", job[0])
+            finally:
+                with self._lock:
+                    self._refreshing.discard(job)
+
+        self._executor.submit(run)
+        return True
+
+    def _prune_requests(self):
+        """trending_window보다 오래된 요청 시각을 버리고 남은 요청이 없는 키워드는 제거 (lock 안에서 호출)"""
+        cutoff = time.time() - self.trending_window
+        for job in list(self._requests):
+            times = self._requests[job]
+            while times and times[0] < cutoff:
+                times.popleft()
+            if not times:
+                del self._requests[job]
+
+    def tracked(self) -> List[Tuple[str, int]]:
+        """갱신 대상 (키워드, max_articles): 설정한 키워드 + 최근 요청 수 상위 trending_limit개"""
+        jobs = [(keyword, self.max_articles) for keyword in self.keywords]
+        with self._lock:
+            self._prune_requests()
+            trending = sorted(
+                self._requests, key=lambda job: len(self._requests[job]), reverse=True
+            )[:self.trending_limit]
+        return jobs + [job for job in trending if job not in jobs]
+
+    def run_pending(self) -> int:
+        """결과가 없거나 stale인 대상의 재계산을 시작하고 시작한 개수 반환"""
+        started = 0
+        for keyword, max_articles in self.tracked():
+            cached = self.store.get(self._key(keyword, max_articles))
+            if cached is not None and time.time() - cached[1] <= self.refresh_after:
+                continue
+            started += self.refresh_async(keyword, max_articles)
+        return started
+
+    def start(self):
+        """interval마다 run_pending을 실행하는 백그라운드 스레드 시작"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.run_pending()
+                except Exception:
+                    logger.exception("precompute loop failed")
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="precompute-scheduler")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=True)
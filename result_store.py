@@ -0,0 +1,345 @@
+"""
+실행 결과 컬럼형 저장소 (기사, 임베딩, 클러스터, 요약)
+
+실행이 끝날 때마다 결과를 append 하고, 읽을 때는 memory map으로 열어
+파이썬 dict로 바꾸지 않고 Arrow 테이블/NumPy 배열 그대로 분석할 수 있게 함
+
+디렉터리 구성
+- articles/, clusters/, summaries/: 테이블별 Arrow IPC 세그먼트 파일 (append 한 번 = 파일 하나)
+    - articles: article_id, run_id, keyword, url, title, text, fetched_at
+    - clusters: run_id, keyword, cluster_id, article_id, is_representative (멤버 한 명당 한 행)
+    - summaries: run_id, keyword, generated_at, cluster_id, size,
+      representative_article_id, summary, related_titles
+- embeddings.f32: article_id 순서의 고정 폭 float32 행렬 (np.memmap으로 읽음)
+- meta.json: 임베딩 차원, 모델, 기록된 기사 수, 테이블별 확정된 세그먼트 파일 이름
+  (meta에 없는 세그먼트는 append가 중간에 실패한 것이라 읽지 않고, 다음 append 때 삭제)
+- .lock: append/compact 잠금 파일 (여러 인스턴스/프로세스가 같은 디렉터리에 써도 article_id가 겹치지 않음)
+
+테이블은 pyarrow가 필요하고 (pip install pyarrow), 세그먼트가 많아지면 compact()로 합침
+"""
+import os
+import json
+import time
+import uuid
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cache import file_lock
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+
+TABLES = ("articles", "clusters", "summaries")
+
+# 같은 프로세스에서 같은 디렉터리를 연 인스턴스끼리는 lock을 공유 (스레드 간 직렬화용)
+# 인스턴스마다 meta가 따로 있으므로 append 안전성은 .lock 파일 잠금 + meta 재로드가 보장
+_directory_locks: Dict[str, threading.Lock] = {}
+_directory_locks_guard = threading.Lock()
+
+
+def _directory_lock(directory: str) -> threading.Lock:
+    with _directory_locks_guard:
+        return _directory_locks.setdefault(os.path.realpath(directory), threading.Lock())
+
+
+def _schemas() -> Dict[str, "pa.Schema"]:
+    return {
+        "articles": pa.schema([
+            ("article_id", pa.int64()),
+            ("run_id", pa.string()),
+            ("keyword", pa.string()),
+            ("url", pa.string()),
+            ("title", pa.string()),
+            ("text", pa.string()),
+            ("fetched_at", pa.float64()),
+        ]),
+        "clusters": pa.schema([
+            ("run_id", pa.string()),
+            ("keyword", pa.string()),
+            ("cluster_id", pa.int32()),
+            ("article_id", pa.int64()),
+            ("is_representative", pa.bool_()),
+        ]),
+        "summaries": pa.schema([
+            ("run_id", pa.string()),
+            ("keyword", pa.string()),
+            ("generated_at", pa.string()),
+            ("cluster_id", pa.int32()),
+            ("size", pa.int32()),
+            ("representative_article_id", pa.int64()),
+            ("summary", pa.string()),
+            ("related_titles", pa.list_(pa.string())),
+        ]),
+    }
+
+
+class ResultStore:
+    """
+    Args:
+        directory: 저장 디렉터리 (없으면 생성)
+        model: 임베딩 모델 이름 (처음 기록할 때 meta.json에 저장, 다른 모델로 append하면 ValueError)
+    """
+
+    def __init__(self, directory: str, model: Optional[str] = None):
+        if pa is None:
+            raise ValueError("pyarrow 패키지가 설치되지 않았습니다: pip install pyarrow")
+
+        self.directory = directory
+        self.model = model
+        self.embeddings_path = os.path.join(directory, "embeddings.f32")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.lock_path = os.path.join(directory, ".lock")
+        self._schemas = _schemas()
+        self._lock = _directory_lock(directory)
+        self._matrix = None
+
+        for table in TABLES:
+            os.makedirs(os.path.join(directory, table), exist_ok=True)
+
+        self.meta = {'dim': None, 'model': model, 'n_articles': 0}
+        self._load_meta()
+
+    def __len__(self) -> int:
+        return self.meta['n_articles']
+
+    def _load_meta(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                self.meta.update(json.load(f))
+
+    def refresh(self):
+        """다른 인스턴스/프로세스가 append한 내용을 보도록 meta.json 다시 읽기"""
+        with self._lock:
+            self._load_meta()
+
+    # ------------------------------------------------------------ 쓰기
+
+    def _listed_segments(self, table: str) -> List[str]:
+        """디렉터리에 있는 세그먼트 파일 이름 (확정 여부와 무관)"""
+        directory = os.path.join(self.directory, table)
+        return sorted(name for name in os.listdir(directory) if name.endswith(".arrow"))
+
+    def _segments(self, table: str) -> List[str]:
+        """meta에 확정된 세그먼트 경로 (segments가 없는 예전 meta는 디렉터리의 파일 전체)"""
+        segments = self.meta.get('segments')
+        names = segments[table] if segments else self._listed_segments(table)
+        return [os.path.join(self.directory, table, name) for name in names]
+
+    def _remove_uncommitted(self):
+        """
+        meta에 없는 세그먼트(중간에 실패한 append/compact가 남긴 파일) 삭제
+        (lock + 파일 잠금 안에서 호출, 예전 meta면 지금 있는 파일을 확정된 것으로 기록)
+        """
+        if not self.meta.get('segments'):
+            self.meta['segments'] = {table: self._listed_segments(table) for table in TABLES}
+            return
+        for table in TABLES:
+            committed = set(self.meta['segments'][table])
+            directory = os.path.join(self.directory, table)
+            for name in os.listdir(directory):
+                uncommitted = name.endswith(".arrow") and name not in committed
+                if uncommitted or name.endswith(".tmp"):
+                    os.remove(os.path.join(directory, name))
+
+    def _write_segment(self, table: str, rows) -> Tuple[str, str]:
+        """
+        rows(컬럼별 리스트 dict 또는 Arrow 테이블)를 임시 세그먼트 파일로 기록
+
+        Returns:
+            (임시 경로, 최종 경로), 모든 테이블을 다 쓴 뒤 os.replace로 한꺼번에 공개
+        """
+        batch = rows if isinstance(rows, pa.Table) else pa.Table.from_pydict(
+            rows, schema=self._schemas[table]
+        )
+        directory = os.path.join(self.directory, table)
+        name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}.arrow"
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, batch.schema) as writer:
+                writer.write_table(batch)
+        return tmp_path, os.path.join(directory, name)
+
+    def _save_meta(self, meta: Dict):
+        """meta.json 교체 후 self.meta 갱신 (실패하면 self.meta는 그대로)"""
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+        self.meta = meta
+
+    def append_run(
+        self, keyword: str, articles: List[Dict], embeddings: np.ndarray,
+        clusters: List[Dict], results: List[Dict], run_id: Optional[str] = None) -> str:
+        """
+        파이프라인 실행 결과 한 번을 append
+
+        Args:
+            keyword: 검색 키워드
+            articles: 유효 기사 리스트 (embeddings와 같은 순서)
+            embeddings: 기사별 임베딩 (기사 수 x 차원)
+            clusters: cluster_articles 결과
+            results: summarize_cluster 결과 리스트
+
+        Returns:
+            이번 실행의 run_id
+        """
+        run_id = run_id or uuid.uuid4().hex
+        generated_at = datetime.now(timezone.utc).isoformat()
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if len(articles) != len(embeddings):
+            raise ValueError(f"기사 수와 임베딩 수가 다릅니다: {len(articles)} != {len(embeddings)}")
+
+        # 같은 디렉터리에 쓰는 다른 인스턴스/프로세스와 직렬화하고,
+        # 그쪽이 기록한 기사 수 이후부터 이어 쓰도록 meta를 다시 읽음
+        with self._lock, file_lock(self.lock_path):
+            self._load_meta()
+            self._remove_uncommitted()
+            if self.meta['dim'] is None:
+                self.meta['dim'] = int(embeddings.shape[1])
+                self.meta['model'] = self.model
+            elif embeddings.shape[1] != self.meta['dim']:
+                raise ValueError(
+                    f"임베딩 차원이 저장소와 다릅니다: {embeddings.shape[1]} != {self.meta['dim']}"
+                )
+            if self.model and self.meta['model'] and self.model != self.meta['model']:
+                raise ValueError(
+                    f"임베딩 모델이 저장소와 다릅니다: {self.model} != {self.meta['model']}"
+                )
+
+            # 이전 append가 중간에 끊겼으면 기록된 기사 수 이후의 임베딩 행은 버림
+            start = self.meta['n_articles']
+            with open(self.embeddings_path, "ab") as f:
+                f.truncate(start * self.meta['dim'] * 4)
+                f.write(embeddings.tobytes())
+
+            article_ids = {}
+            for offset, article in enumerate(articles):
+                article_ids[article['url']] = start + offset
+
+            segments = [self._write_segment("articles", {
+                'article_id': [start + i for i in range(len(articles))],
+                'run_id': [run_id] * len(articles),
+                'keyword': [keyword] * len(articles),
+                'url': [a['url'] for a in articles],
+                'title': [a.get('title') for a in articles],
+                'text': [a.get('text') for a in articles],
+                'fetched_at': [float(a.get('fetched_at') or time.time()) for a in articles],
+            })]
+
+            members = [
+                (cluster['cluster_id'], article_ids[article['url']],
+                 article['url'] == cluster['representative']['url'])
+                for cluster in clusters for article in cluster['articles']
+            ]
+            segments.append(self._write_segment("clusters", {
+                'run_id': [run_id] * len(members),
+                'keyword': [keyword] * len(members),
+                'cluster_id': [m[0] for m in members],
+                'article_id': [m[1] for m in members],
+                'is_representative': [m[2] for m in members],
+            }))
+
+            representatives = {
+                cluster['cluster_id']: article_ids[cluster['representative']['url']]
+                for cluster in clusters
+            }
+            segments.append(self._write_segment("summaries", {
+                'run_id': [run_id] * len(results),
+                'keyword': [keyword] * len(results),
+                'generated_at': [generated_at] * len(results),
+                'cluster_id': [r['cluster_id'] for r in results],
+                'size': [r['size'] for r in results],
+                'representative_article_id': [representatives[r['cluster_id']] for r in results],
+                'summary': [r['summary'] for r in results],
+                'related_titles': [r['related_titles'] for r in results],
+            }))
+
+            # 세 테이블을 다 쓴 뒤에 파일 이름을 바꾸고, 마지막에 meta에 세그먼트와 기사 수를 기록해 확정
+            # (meta 저장 전에 실패하면 세그먼트는 meta에 없으므로 읽히지 않음)
+            meta = {
+                **self.meta,
+                'n_articles': start + len(articles),
+                'segments': {table: list(names) for table, names in self.meta['segments'].items()},
+            }
+            for table, (tmp_path, path) in zip(TABLES, segments):
+                os.replace(tmp_path, path)
+                meta['segments'][table].append(os.path.basename(path))
+            self._save_meta(meta)
+
+        return run_id
+
+    # ------------------------------------------------------------ 읽기
+
+    def table(self, name: str) -> "pa.Table":
+        """테이블 전체 (확정된 세그먼트를 memory map으로 열어 복사 없이 이어 붙임)"""
+        if name not in TABLES:
+            raise ValueError(f"알 수 없는 테이블입니다: {name}")
+        # 다른 인스턴스의 append/compact가 바꾼 세그먼트 목록을 반영
+        self.refresh()
+        tables = [
+            pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            for path in self._segments(name)
+        ]
+        if not tables:
+            return self._schemas[name].empty_table()
+        table = pa.concat_tables(tables)
+        if name == "articles":
+            # segments가 없는 예전 meta에서 append가 끊긴 경우 기록되지 않은 기사는 제외
+            table = table.filter(pa.compute.less(table['article_id'], len(self)))
+        return table
+
+    def articles(self) -> "pa.Table":
+        return self.table("articles")
+
+    def clusters(self) -> "pa.Table":
+        return self.table("clusters")
+
+    def summaries(self) -> "pa.Table":
+        return self.table("summaries")
+
+    def embeddings(self) -> np.ndarray:
+        """article_id 순서의 (기사 수 x 차원) float32 memmap (읽기 전용)"""
+        n, dim = len(self), self.meta['dim']
+        if not n:
+            return np.empty((0, dim or 0), dtype=np.float32)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[0] != n:
+                self._matrix = np.memmap(
+                    self.embeddings_path, dtype=np.float32, mode="r", shape=(n, dim)
+                )
+            return self._matrix
+
+    def compact(self):
+        """테이블마다 세그먼트를 파일 하나로 합침 (읽기 속도/파일 수 정리용)"""
+        with self._lock, file_lock(self.lock_path):
+            self._load_meta()
+            self._remove_uncommitted()
+            meta = {
+                **self.meta,
+                'segments': {table: list(names) for table, names in self.meta['segments'].items()},
+            }
+            replaced = []
+            for name in TABLES:
+                segments = self._segments(name)
+                if len(segments) <= 1:
+                    continue
+                table = pa.concat_tables(
+                    pa.ipc.open_file(pa.memory_map(path, "r")).read_all() for path in segments
+                )
+                tmp_path, path = self._write_segment(name, table)
+                os.replace(tmp_path, path)
+                meta['segments'][name] = [os.path.basename(path)]
+                replaced.extend(segments)
+
+            # 새 세그먼트를 meta에 확정한 뒤에 이전 세그먼트 삭제
+            self._save_meta(meta)
+            for path in replaced:
+                os.remove(path)
@@ -0,0 +1,231 @@
+"""
+NewsSummarizer HTTP API 서버 (aiohttp)
+
+프로세스 하나에서 NewsSummarizer 인스턴스 하나(HTTP 커넥션 풀, 캐시, OpenAI 클라이언트)를
+모든 요청이 공유하고, 같은 키워드/파라미터로 동시에 들어온 요청은 실행 중인
+파이프라인 하나의 결과를 함께 받음 (single-flight)
+
+엔드포인트
+- GET /search?q=키워드&max_articles=20: 기사 URL 리스트
+  (max_articles는 1 ~ max_articles_limit, 벗어나면 400)
+- GET /summarize?q=키워드&max_articles=20&clusters=3&incremental=0: 클러스터별 요약
+  (clusters=auto면 자동 선택, 숫자면 1 ~ max_articles, incremental=1이면 run_incremental)
+- GET /related?url=기사URL&k=5: 저장된 과거 기사 중 비슷한 기사 (history_dir 설정 시)
+- GET /metrics: Prometheus text 포맷, GET /healthz
+
+사용법 (저장소 루트에서):
+    python server.py --port 8080
+"""
+import sys
+import json
+import asyncio
+import argparse
+import functools
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+from news_summarizer import NewsSummarizer
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+
+class SingleFlight:
+    """
+    같은 key의 작업이 실행 중이면 새로 시작하지 않고 그 결과를 함께 기다림
+
+    결과는 저장하지 않으므로 작업이 끝난 뒤 들어온 요청은 다시 실행함
+    (반복 요청은 NewsSummarizer의 기사/임베딩/요약 캐시가 처리)
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 기다리던 요청 하나가 취소되어도 다른 요청이 받을 작업은 계속 진행
+        return await asyncio.shield(future)
+
+
+def _parse_clusters(value: str) -> Optional[int]:
+    return None if value == "auto" else int(value)
+
+
+def create_app(
+    summarizer: Optional[NewsSummarizer] = None, max_concurrent_runs: int = 4,
+    max_articles_limit: int = 100):
+    """
+    API 애플리케이션 생성
+
+    Args:
+        summarizer: 공유할 NewsSummarizer (없으면 기본 설정으로 생성, 서버 종료 시 close)
+        max_concurrent_runs: 동시에 실행할 파이프라인 수 (블로킹 실행용 스레드 수)
+        max_articles_limit: 요청 하나가 크롤링할 수 있는 최대 기사 수
+    """
+    if web is None:
+        raise ValueError("aiohttp 패키지가 설치되지 않았습니다: pip install aiohttp")
+
+    owns_summarizer = summarizer is None
+    summarizer = summarizer or NewsSummarizer()
+    executor = ThreadPoolExecutor(max_workers=max_concurrent_runs, thread_name_prefix="pipeline")
+    flights = SingleFlight()
+    dumps = functools.partial(json.dumps, ensure_ascii=False)
+
+    async def run_blocking(key: Hashable, func, *args):
+        if key in flights:
+            summarizer.metrics.incr("server_coalesced_requests")
+        loop = asyncio.get_running_loop()
+        return await flights.do(key, lambda: loop.run_in_executor(executor, func, *args))
+
+    def summarize(keyword: str, max_articles: int, n_clusters: Optional[int]) -> Dict:
+        record = summarizer.run_record(keyword, max_articles, n_clusters)
+        # 기사 본문은 응답에서 제외
+        del record['articles']
+        return record
+
+    def summarize_incremental(keyword: str, max_articles: int, n_clusters: Optional[int]) -> Dict:
+        results = summarizer.run_incremental(keyword, max_articles, n_clusters)
+        return {
+            'keyword': keyword,
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'n_articles': sum(result['size'] for result in results),
+            'results': results,
+        }
+
+    def keyword_params(request) -> Dict:
+        keyword = request.query.get("q", "").strip()
+        if not keyword:
+            raise web.HTTPBadRequest(
+                text=dumps({'error': "q 파라미터가 필요합니다"}), content_type="application/json"
+            )
+        try:
+            params = {
+                'keyword': keyword,
+                'max_articles': int(request.query.get("max_articles", min(20, max_articles_limit))),
+                'n_clusters': _parse_clusters(request.query.get("clusters", "3")),
+                'incremental': request.query.get("incremental", "0") in ("1", "true"),
+            }
+        except ValueError as e:
+            raise web.HTTPBadRequest(
+                text=dumps({'error': str(e)}), content_type="application/json"
+            )
+        # 요청 하나가 공유 프로세스에서 무제한으로 크롤링/요약하지 않도록 제한
+        if not 1 <= params['max_articles'] <= max_articles_limit:
+            raise web.HTTPBadRequest(
+                text=dumps({'error': f"max_articles는 1 ~ {max_articles_limit} 사이여야 합니다"}),
+                content_type="application/json",
+            )
+        n_clusters = params['n_clusters']
+        if n_clusters is not None and not 1 <= n_clusters <= params['max_articles']:
+            raise web.HTTPBadRequest(
+                text=dumps({'error': "clusters는 auto 또는 1 ~ max_articles 사이여야 합니다"}),
+                content_type="application/json",
+            )
+        return params
+
+    async def handle_search(request):
+        params = keyword_params(request)
+        summarizer.metrics.incr("server_search_requests")
+        urls = await run_blocking(
+            ("search", params['keyword'], params['max_articles']),
+            summarizer.get_news_url, params['keyword'], params['max_articles'],
+        )
+        return web.json_response({'keyword': params['keyword'], 'urls': urls}, dumps=dumps)
+
+    async def handle_summarize(request):
+        params = keyword_params(request)
+        summarizer.metrics.incr("server_summarize_requests")
+        func = summarize_incremental if params['incremental'] else summarize
+        record = await run_blocking(
+            ("summarize", params['keyword'], params['max_articles'],
+             params['n_clusters'], params['incremental']),
+            func, params['keyword'], params['max_articles'], params['n_clusters'],
+        )
+        return web.json_response(record, dumps=dumps)
+
+    async def handle_related(request):
+        url = request.query.get("url", "").strip()
+        if not url:
+            raise web.HTTPBadRequest(
+                text=dumps({'error': "url 파라미터가 필요합니다"}), content_type="application/json"
+            )
+        try:
+            k = int(request.query.get("k", 5))
+        except ValueError as e:
+            raise web.HTTPBadRequest(
+                text=dumps({'error': str(e)}), content_type="application/json"
+            )
+        if not 1 <= k <= max_articles_limit:
+            raise web.HTTPBadRequest(
+                text=dumps({'error': f"k는 1 ~ {max_articles_limit} 사이여야 합니다"}),
+                content_type="application/json",
+            )
+        loop = asyncio.get_running_loop()
+        related = await loop.run_in_executor(executor, summarizer.related_articles, url, k)
+        return web.json_response({'url': url, 'related': related}, dumps=dumps)
+
+    async def handle_metrics(request):
+        return web.Response(
+            text=summarizer.metrics.to_prometheus(), content_type="text/plain",
+            headers={"X-Prometheus-Format": "0.0.4"},
+        )
+
+    async def handle_health(request):
+        return web.json_response({'status': 'ok'})
+
+    async def on_cleanup(app):
+        executor.shutdown(wait=False, cancel_futures=True)
+        if owns_summarizer:
+            summarizer.close()
+
+    app = web.Application()
+    app['summarizer'] = summarizer
+    app.router.add_get("/search", handle_search)
+    app.router.add_get("/summarize", handle_summarize)
+    app.router.add_get("/related", handle_related)
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/healthz", handle_health)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="뉴스 클러스터링 요약 HTTP API 서버")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrent-runs", type=int, default=4,
+                        help="동시에 실행할 파이프라인 수")
+    parser.add_argument("--max-articles-limit", type=int, default=100,
+                        help="요청 하나의 max_articles 상한")
+    parser.add_argument("--history-dir", help="실행 결과를 누적하고 /related에서 검색할 디렉터리")
+    args = parser.parse_args(argv)
+
+    try:
+        summarizer = NewsSummarizer(history_dir=args.history_dir)
+        app = create_app(
+            summarizer, max_concurrent_runs=args.max_concurrent_runs,
+            max_articles_limit=args.max_articles_limit,
+        )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    try:
+        web.run_app(app, host=args.host, port=args.port)
+    finally:
+        summarizer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+ResultStore에 쌓인 기사 임베딩의 최근접 이웃 인덱스 ("관련 기사" 검색용)
+
+- "hnsw": hnswlib HNSW 그래프 (근사 검색, 조회 비용이 기사 수에 대해 로그 수준)
+  인덱스 파일을 저장소 디렉터리에 저장하고, sync() 때 새로 추가된 기사만 삽입
+- "exact": 임베딩 memmap을 block_size 행씩 읽어 행렬곱으로 정확한 top-k 계산
+  (hnswlib가 없을 때의 기본값, 메모리는 블록 크기만큼만 사용)
+- "auto": hnswlib가 설치되어 있으면 "hnsw", 아니면 "exact"
+
+임베딩은 L2 정규화되어 있으므로 유사도는 내적(= 코사인 유사도)
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from result_store import ResultStore
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+def top_k_blocked(
+    queries: np.ndarray, matrix: np.ndarray, k: int,
+    block_size: int = 8192) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    queries와 matrix 행 사이 내적 기준 top-k (정확한 검색)
+
+    matrix를 블록 단위로 읽어 블록마다 후보 k개만 남기고 누적하므로
+    전체 유사도 행렬을 만들지 않음
+
+    Returns:
+        (행 인덱스, 유사도), 둘 다 (쿼리 수 x min(k, 행 수)), 유사도 내림차순
+    """
+    n = matrix.shape[0]
+    k = min(k, n)
+    best_ids = np.empty((len(queries), 0), dtype=np.int64)
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+
+    for start in range(0, n, block_size):
+        block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+        scores = queries @ block.T
+        if scores.shape[1] > k:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, part, axis=1)
+        else:
+            part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        best_ids = np.concatenate([best_ids, part + start], axis=1)
+        best_scores = np.concatenate([best_scores, scores], axis=1)
+
+        if best_ids.shape[1] > k:
+            keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+            best_ids = np.take_along_axis(best_ids, keep, axis=1)
+            best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_ids, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+class VectorIndex:
+    """
+    Args:
+        store: 기사/임베딩이 쌓이는 ResultStore
+        backend: "auto" / "hnsw" / "exact"
+        ef: HNSW 검색 시 후보 수 (클수록 정확하고 느림)
+        m: HNSW 노드당 연결 수
+        block_size: exact 검색 블록 행 수
+    """
+
+    def __init__(
+        self, store: ResultStore, backend: str = "auto", ef: int = 64, m: int = 16,
+        block_size: int = 8192):
+        if backend == "auto":
+            backend = "hnsw" if hnswlib is not None else "exact"
+        if backend not in ("hnsw", "exact"):
+            raise ValueError(f"알 수 없는 인덱스 백엔드입니다: {backend}")
+        if backend == "hnsw" and hnswlib is None:
+            raise ValueError("hnswlib 패키지가 설치되지 않았습니다: pip install hnswlib")
+
+        self.store = store
+        self.backend = backend
+        self.ef = ef
+        self.m = m
+        self.block_size = block_size
+        self.index_path = os.path.join(store.directory, "index.hnsw")
+        self._lock = threading.Lock()
+        self._hnsw = None
+        self._metadata = None
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _hnsw_index(self, dim: int):
+        """HNSW 인덱스 (처음 쓸 때 파일에서 읽거나 새로 만듦, lock 안에서 호출)"""
+        if self._hnsw is None:
+            index = hnswlib.Index(space="ip", dim=dim)
+            capacity = max(1024, len(self.store))
+            if os.path.exists(self.index_path):
+                index.load_index(self.index_path, max_elements=capacity)
+            else:
+                index.init_index(max_elements=capacity, ef_construction=200, M=self.m)
+            index.set_ef(self.ef)
+            self._hnsw = index
+        return self._hnsw
+
+    def sync(self) -> int:
+        """
+        저장소에 새로 추가된 기사를 인덱스에 반영
+
+        Returns:
+            새로 반영한 기사 수
+        """
+        self.store.refresh()
+        with self._lock:
+            self._metadata = None
+            n = len(self.store)
+            if self.backend == "exact" or n == 0:
+                return 0
+
+            index = self._hnsw_index(self.store.meta['dim'])
+            indexed = index.get_current_count()
+            if indexed >= n:
+                return 0
+
+            if n > index.get_max_elements():
+                index.resize_index(max(n, index.get_max_elements() * 2))
+            vectors = np.asarray(self.store.embeddings()[indexed:n], dtype=np.float32)
+            index.add_items(vectors, np.arange(indexed, n))
+            # 같은 디렉터리의 다른 VectorIndex가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+            tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            index.save_index(tmp_path)
+            os.replace(tmp_path, self.index_path)
+            return n - indexed
+
+    def search(self, queries: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        L2 정규화된 쿼리 벡터들의 top-k 기사
+
+        Returns:
+            (article_id, 코사인 유사도), 둘 다 (쿼리 수 x k'), 유사도 내림차순
+            (k'은 k와 기사 수 중 작은 값)
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        n = len(self.store)
+        if n == 0:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+
+        if self.backend == "exact":
+            return top_k_blocked(queries, self.store.embeddings(), k, self.block_size)
+
+        with self._lock:
+            index = self._hnsw_index(queries.shape[1])
+            k = min(k, index.get_current_count())
+            if k == 0:
+                return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+            labels, distances = index.knn_query(queries, k=k)
+        # ip 공간의 거리는 1 - 내적
+        return labels.astype(np.int64), (1.0 - distances).astype(np.float32)
+
+    def _article_metadata(self) -> Dict[str, np.ndarray]:
+        """article_id 순서의 url/title/keyword/fetched_at 컬럼 (본문 제외, sync 전까지 재사용)"""
+        with self._lock:
+            if self._metadata is None:
+                table = self.store.articles().select(
+                    ["article_id", "url", "title", "keyword", "fetched_at"]
+                ).sort_by("article_id")
+                self._metadata = {
+                    name: table[name].to_numpy(zero_copy_only=False) for name in table.column_names
+                }
+            return self._metadata
+
+    def related(
+        self, url: str, k: int = 5, embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        기사와 비슷한 과거 기사 top-k (같은 URL은 제외하고 URL별로 한 번만)
+
+        Args:
+            url: 기준 기사 URL
+            embedding: 기준 기사 임베딩 (없으면 저장소에서 같은 URL의 가장 최근 임베딩 사용)
+
+        Returns:
+            [{'article_id', 'url', 'title', 'keyword', 'fetched_at', 'similarity'}, ...]
+        """
+        metadata = self._article_metadata()
+        if embedding is None:
+            matches = np.flatnonzero(metadata['url'] == url)
+            if len(matches) == 0:
+                return []
+            embedding = self.store.embeddings()[metadata['article_id'][matches[-1]]]
+
+        # 같은 기사가 여러 실행에 걸쳐 저장되므로 여유 있게 뽑은 뒤 URL 기준으로 거름
+        ids, scores = self.search(embedding, k * 4 + 1)
+        related, seen = [], {url}
+        for article_id, score in zip(ids[0], scores[0]):
+            if article_id >= len(metadata['article_id']):
+                continue
+            article_url = metadata['url'][article_id]
+            if article_url in seen:
+                continue
+            seen.add(article_url)
+            related.append({
+                'article_id': int(article_id),
+                'url': article_url,
+                'title': metadata['title'][article_id],
+                'keyword': metadata['keyword'][article_id],
+                'fetched_at': float(metadata['fetched_at'][article_id]),
+                'similarity': float(score),
+            })
+            if len(related) >= k:
+                break
+        return related